@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import Dict, List
+from sqlalchemy import case, distinct, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Tuple
 from ...core.database import get_db
+from ...core.executor import run_in_executor
 from ...services.portfolio_manager import PortfolioManager
 from ...services.risk_assessor import RiskAssessor
 from ...models import models
@@ -22,8 +24,32 @@ class RebalanceRequest(BaseModel):
     portfolio_id: int
     current_allocation: Dict[str, float]
 
+async def load_portfolio_allocation(db: AsyncSession, portfolio_id: int) -> Tuple[float, Dict[str, float]]:
+    """
+    Total value and {symbol: weight} of a portfolio from its allocation rows, falling back to the
+    JSON allocation column for portfolios written without rows.
+    The outer join yields no rows for an unknown portfolio and a single NULL symbol for an empty one.
+    """
+    rows = (await db.execute(
+        select(
+            models.Portfolio.total_value,
+            models.PortfolioAllocation.symbol,
+            models.PortfolioAllocation.weight
+        )
+        .outerjoin(models.PortfolioAllocation, models.PortfolioAllocation.portfolio_id == models.Portfolio.id)
+        .where(models.Portfolio.id == portfolio_id)
+    )).all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    allocation = {row.symbol: row.weight for row in rows if row.symbol is not None}
+    if not allocation:
+        allocation = (await db.execute(
+            select(models.Portfolio.allocation).where(models.Portfolio.id == portfolio_id)
+        )).scalar_one() or {}
+    return rows[0].total_value, allocation
+
 @router.post("/risk-assessment")
-async def assess_risk(request: RiskAssessmentRequest, db: Session = Depends(get_db)):
+async def assess_risk(request: RiskAssessmentRequest, db: AsyncSession = Depends(get_db)):
     """Calculate risk profile based on questionnaire answers."""
     risk_score = risk_assessor.calculate_risk_score(request.answers)
     risk_level = risk_assessor.determine_risk_level(risk_score)
@@ -38,11 +64,11 @@ async def assess_risk(request: RiskAssessmentRequest, db: Session = Depends(get_
     }
 
 @router.post("/portfolio/optimize")
-async def optimize_portfolio(request: PortfolioAllocationRequest, db: Session = Depends(get_db)):
+async def optimize_portfolio(request: PortfolioAllocationRequest, db: AsyncSession = Depends(get_db)):
     """Generate optimal portfolio allocation."""
     try:
-        allocation = portfolio_manager.optimize_portfolio(request.risk_level)
-        stats = portfolio_manager.get_portfolio_stats(allocation, request.investment_amount)
+        allocation = await run_in_executor(portfolio_manager.optimize_portfolio, request.risk_level)
+        stats = await run_in_executor(portfolio_manager.get_portfolio_stats, allocation, request.investment_amount)
         
         return {
             "allocation": allocation,
@@ -52,15 +78,12 @@ async def optimize_portfolio(request: PortfolioAllocationRequest, db: Session =
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/portfolio/rebalance")
-async def rebalance_portfolio(request: RebalanceRequest, db: Session = Depends(get_db)):
+async def rebalance_portfolio(request: RebalanceRequest, db: AsyncSession = Depends(get_db)):
     """Calculate rebalancing trades needed."""
     try:
-        portfolio = db.query(models.Portfolio).filter(models.Portfolio.id == request.portfolio_id).first()
-        if not portfolio:
-            raise HTTPException(status_code=404, detail="Portfolio not found")
-        
-        target_allocation = portfolio.allocation
-        trades = portfolio_manager.rebalance_portfolio(
+        _, target_allocation = await load_portfolio_allocation(db, request.portfolio_id)
+        trades = await run_in_executor(
+            portfolio_manager.rebalance_portfolio,
             request.current_allocation,
             target_allocation
         )
@@ -73,23 +96,46 @@ async def rebalance_portfolio(request: RebalanceRequest, db: Session = Depends(g
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/portfolio/{portfolio_id}/tax-loss-harvest")
-async def get_tax_loss_harvest(portfolio_id: int, db: Session = Depends(get_db)):
+async def get_tax_loss_harvest(portfolio_id: int, db: AsyncSession = Depends(get_db)):
     """Get tax loss harvesting opportunities."""
     try:
-        portfolio = db.query(models.Portfolio).filter(models.Portfolio.id == portfolio_id).first()
-        if not portfolio:
+        # The outer join returns no rows for an unknown portfolio and a single
+        # NULL symbol for one without transactions
+        symbols = (await db.execute(
+            select(distinct(models.Transaction.symbol))
+            .select_from(models.Portfolio)
+            .outerjoin(models.Transaction, models.Transaction.portfolio_id == models.Portfolio.id)
+            .where(models.Portfolio.id == portfolio_id)
+        )).scalars().all()
+        if not symbols:
             raise HTTPException(status_code=404, detail="Portfolio not found")
-        
-        transactions = db.query(models.Transaction).filter(
-            models.Transaction.portfolio_id == portfolio_id
-        ).all()
-        
+
         # Get current prices for all symbols in the portfolio
-        symbols = set(t.symbol for t in transactions)
-        current_prices = {symbol: portfolio_manager.get_current_price(symbol) for symbol in symbols}
-        
-        opportunities = portfolio_manager.calculate_tax_loss_harvest(
-            [t.__dict__ for t in transactions],
+        current_prices = await run_in_executor(
+            portfolio_manager.get_current_prices,
+            [symbol for symbol in symbols if symbol is not None]
+        )
+
+        # Only lots trading below their purchase price can be harvested, so let
+        # the database drop the rest, and fetch just the columns the scan reads
+        transactions = []
+        if current_prices:
+            current_price = case(current_prices, value=models.Transaction.symbol)
+            transactions = (await db.execute(
+                select(
+                    models.Transaction.symbol,
+                    models.Transaction.shares,
+                    models.Transaction.price
+                ).where(
+                    models.Transaction.portfolio_id == portfolio_id,
+                    models.Transaction.symbol.in_(list(current_prices)),
+                    models.Transaction.price > current_price
+                )
+            )).mappings().all()
+
+        opportunities = await run_in_executor(
+            portfolio_manager.calculate_tax_loss_harvest,
+            transactions,
             current_prices
         )
         
@@ -100,16 +146,15 @@ async def get_tax_loss_harvest(portfolio_id: int, db: Session = Depends(get_db))
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/portfolio/{portfolio_id}/stats")
-async def get_portfolio_stats(portfolio_id: int, db: Session = Depends(get_db)):
+async def get_portfolio_stats(portfolio_id: int, db: AsyncSession = Depends(get_db)):
     """Get portfolio statistics and performance metrics."""
     try:
-        portfolio = db.query(models.Portfolio).filter(models.Portfolio.id == portfolio_id).first()
-        if not portfolio:
-            raise HTTPException(status_code=404, detail="Portfolio not found")
+        total_value, allocation = await load_portfolio_allocation(db, portfolio_id)
         
-        stats = portfolio_manager.get_portfolio_stats(
-            portfolio.allocation,
-            portfolio.total_value
+        stats = await run_in_executor(
+            portfolio_manager.get_portfolio_stats,
+            allocation,
+            total_value
         )
         
         return stats
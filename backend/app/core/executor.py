@@ -0,0 +1,30 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+# Threads per uvicorn worker for CPU-bound PortfolioManager work. The workers already spread
+# requests over the cores, and BLAS and the nogil numba kernels release the GIL, so a few
+# threads keep the event loop free while sharing the module-level price and metrics caches
+PORTFOLIO_THREADS = int(os.getenv("PORTFOLIO_THREADS", "2"))
+_portfolio_executor: Optional[ThreadPoolExecutor] = None
+
+def start_portfolio_executor() -> None:
+    global _portfolio_executor
+    if _portfolio_executor is None:
+        _portfolio_executor = ThreadPoolExecutor(max_workers=PORTFOLIO_THREADS, thread_name_prefix="portfolio")
+
+def shutdown_portfolio_executor() -> None:
+    global _portfolio_executor
+    if _portfolio_executor is not None:
+        _portfolio_executor.shutdown(cancel_futures=True)
+        _portfolio_executor = None
+
+async def run_in_executor(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Await a blocking callable on the portfolio thread pool, started by the app lifespan.
+    Falls back to the event loop's default executor when the lifespan has not run.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_portfolio_executor, partial(func, *args, **kwargs))
\ No newline at end of file
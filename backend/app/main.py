@@ -1,36 +1,290 @@
-from fastapi import FastAPI, HTTPException, Depends
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from typing import List, Dict, Optional
+from fastapi import APIRouter, FastAPI, HTTPException, Depends, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Any, List, Dict, Mapping, Optional, Tuple, Type, TypeVar, Final
 import uvicorn
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter, ValidationError
 import logging
-from datetime import datetime
-from sqlalchemy.orm import Session
+import os
+import sys
+import time
+from bisect import bisect_right
+from datetime import date, datetime
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from types import MappingProxyType
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.exceptions import RequestValidationError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from . import models, schemas
-from .core.database import SessionLocal, engine
+from .core.database import async_engine, engine, get_db
+from .core.executor import run_in_executor, shutdown_portfolio_executor, start_portfolio_executor
+from .models.models import migrate_portfolio_allocations
+from .models.portfolio import add_portfolio_indexes, migrate_simulation_results
 from app.services.portfolio_manager import PortfolioManager
-import json
+from app.services.solvers import rebalance_trades
+import hashlib
+import orjson
+from cachetools import TTLCache
+
+class NumpyORJSONResponse(ORJSONResponse):
+    """
+    ORJSONResponse that also serializes NumPy scalars and arrays.
+    Handlers with plain JSON data can return it directly to skip FastAPI's jsonable_encoder pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def wants_ndjson(request: Request) -> bool:
+    """Whether the client asked for newline-delimited JSON instead of a JSON array."""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+def ndjson_response(rows: List[Dict]) -> StreamingResponse:
+    """Stream rows as newline-delimited JSON, encoding one row at a time."""
+    async def generate():
+        for row in rows:
+            yield orjson.dumps(row, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n"
+
+    return StreamingResponse(generate(), media_type=NDJSON_MEDIA_TYPE)
+
+# Rows encoded per streamed chunk; keeps per-send overhead low for long series
+JSON_STREAM_CHUNK_ROWS = 256
+
+def json_array_response(rows: List[Dict], key: Optional[str] = None) -> StreamingResponse:
+    """
+    Stream a JSON array, or {key: [...]} when a key is given, encoding a chunk of rows at a time.
+    The body is identical to serializing the whole payload at once.
+    """
+    async def generate():
+        yield b"{" + orjson.dumps(key) + b":[" if key is not None else b"["
+        for start in range(0, len(rows), JSON_STREAM_CHUNK_ROWS):
+            chunk = orjson.dumps(rows[start:start + JSON_STREAM_CHUNK_ROWS], option=orjson.OPT_SERIALIZE_NUMPY)
+            yield (b"," if start else b"") + chunk[1:-1]
+        yield b"]}" if key is not None else b"]"
+
+    return StreamingResponse(generate(), media_type="application/json")
+
+def weak_etag(body: bytes) -> str:
+    """Weak ETag derived from a response body."""
+    return f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match header already names the given ETag."""
+    return etag in (tag.strip() for tag in request.headers.get("if-none-match", "").split(","))
+
+def cacheable_response(request: Request, content: Any, max_age: int = 5) -> Response:
+    """
+    JSON response with Cache-Control and a weak ETag.
+    Answers 304 Not Modified when the client already holds the same body.
+    """
+    response = NumpyORJSONResponse(content, headers={"Cache-Control": f"public, max-age={max_age}"})
+    etag = weak_etag(response.body)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"Cache-Control": response.headers["Cache-Control"], "ETag": etag})
+    response.headers["ETag"] = etag
+    return response
+
+class StaticJSONResponse:
+    """
+    JSON body for a payload that never changes, encoded and hashed once at import.
+    Each request then reuses the prebuilt bytes instead of serializing again.
+    """
+
+    def __init__(self, content: Any, max_age: int = 5):
+        self.body = orjson.dumps(content)
+        self.headers = {"Cache-Control": f"public, max-age={max_age}", "ETag": weak_etag(self.body)}
+
+    def __call__(self, request: Request) -> Response:
+        if etag_matches(request, self.headers["ETag"]):
+            return Response(status_code=304, headers=self.headers)
+        return Response(self.body, media_type="application/json", headers=self.headers)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+def json_body(model: Type[ModelT]) -> Any:
+    """
+    Dependency that validates the raw request body in one pydantic-core pass.
+    Skips the intermediate json.loads() dict FastAPI builds for body parameters.
+    """
+    async def parse(request: Request) -> ModelT:
+        try:
+            return model.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors()])
+
+    return Depends(parse)
+
+def json_body_openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    """OpenAPI request body for a route that parses its body with json_body()."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": model.model_json_schema()}}
+        }
+    }
+
+class FastCORSMiddleware:
+    """
+    Pure ASGI CORS middleware for the allow-everything development policy.
+    Appends prebuilt header pairs instead of building Headers objects per request.
+    """
+
+    ALLOW_METHODS = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+    MAX_AGE = b"600"
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        origin = headers.get(b"origin")
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Credentials are allowed, so the origin is echoed back rather than "*"
+        cors_headers = [
+            (b"access-control-allow-origin", origin),
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin")
+        ]
+
+        # Answer preflight requests here without entering the application
+        if scope["method"] == "OPTIONS" and b"access-control-request-method" in headers:
+            cors_headers.append((b"access-control-allow-methods", self.ALLOW_METHODS))
+            cors_headers.append((b"access-control-max-age", self.MAX_AGE))
+            if b"access-control-request-headers" in headers:
+                cors_headers.append((b"access-control-allow-headers", headers[b"access-control-request-headers"]))
+            await send({"type": "http.response.start", "status": 204, "headers": cors_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *cors_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+# PortfolioManager keeps its caches at module level, so one instance per worker
+# serves every request, as in the API routers
+PORTFOLIO_MANAGER: Final[PortfolioManager] = PortfolioManager()
+
+def get_portfolio_manager() -> PortfolioManager:
+    return PORTFOLIO_MANAGER
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Bring databases created by earlier versions up to date: add portfolio_allocations with the
+    # JSON allocations copied in, the portfolio_id indexes, and turn simulation results stored
+    # as text into bytes
+    async with async_engine.begin() as connection:
+        await connection.run_sync(migrate_portfolio_allocations)
+        await connection.run_sync(add_portfolio_indexes)
+        await connection.run_sync(migrate_simulation_results)
+    start_portfolio_executor()
+    yield
+    shutdown_portfolio_executor()
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Robo Advisor API",
     description="API for automated financial advisory services",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=NumpyORJSONResponse,
+    # Schema generation and the docs UI are development aids
+    openapi_url="/openapi.json" if os.getenv("ENV") == "dev" else None
 )
 
+# Routes are grouped by path prefix and included into the app at the bottom of the module
+portfolio_router = APIRouter(prefix="/api/portfolio", tags=["portfolio"])
+self_defined_router = APIRouter(prefix="/api/self-defined-portfolios", tags=["self-defined portfolios"])
+goals_router = APIRouter(prefix="/api/goals", tags=["goals"])
+advisor_router = APIRouter(prefix="/api", tags=["advisor"])
+meta_router = APIRouter(include_in_schema=False)
+
 # Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins during development
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+app.add_middleware(FastCORSMiddleware)  # Allow all origins during development
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+# INFO request logging is for development; production only logs warnings and errors
+logging.basicConfig(level=logging.INFO if os.getenv("ENV") == "dev" else logging.WARNING)
 logger = logging.getLogger(__name__)
 
+# Random generator for the mock performance data
+rng = np.random.default_rng()
+
+# Risk score cut-offs; a score below RISK_LEVEL_THRESHOLDS[i] maps to RISK_LEVELS[i]
+RISK_LEVEL_THRESHOLDS: Final[Tuple[float, ...]] = (0.3, 0.5, 0.7, 0.8)
+RISK_LEVELS: Final[Tuple[str, ...]] = (
+    "conservative",
+    "moderate_conservative",
+    "moderate",
+    "moderate_aggressive",
+    "aggressive"
+)
+
+# Read-only; the inner dicts stay plain so orjson can serialize them as-is
+RISK_SUMMARIES: Final[Mapping[str, Dict[str, str]]] = MappingProxyType({
+    "conservative": {
+        "description": "Focus on preserving capital with modest growth potential",
+        "suitable_for": "Investors close to retirement or with low risk tolerance",
+        "expected_return": "4-6% annually",
+        "volatility": "Low",
+        "investment_horizon": "1-3 years"
+    },
+    "moderate_conservative": {
+        "description": "Balanced approach with emphasis on stability",
+        "suitable_for": "Investors seeking steady growth with limited volatility",
+        "expected_return": "5-7% annually",
+        "volatility": "Low to Medium",
+        "investment_horizon": "3-5 years"
+    },
+    "moderate": {
+        "description": "Balance between growth and stability",
+        "suitable_for": "Investors comfortable with market fluctuations",
+        "expected_return": "6-8% annually",
+        "volatility": "Medium",
+        "investment_horizon": "5-10 years"
+    },
+    "moderate_aggressive": {
+        "description": "Growth-oriented with higher risk tolerance",
+        "suitable_for": "Long-term investors seeking capital appreciation",
+        "expected_return": "7-9% annually",
+        "volatility": "Medium to High",
+        "investment_horizon": "10-15 years"
+    },
+    "aggressive": {
+        "description": "Maximum growth potential with high risk tolerance",
+        "suitable_for": "Young investors with long time horizons",
+        "expected_return": "8-10%+ annually",
+        "volatility": "High",
+        "investment_horizon": "15+ years"
+    }
+})
+
+# Target allocation used by the rebalance endpoint, also kept as parallel arrays
+# for the vectorized trade calculation
+TARGET_ALLOCATION: Final[Dict[str, float]] = {
+    "VTI": 0.36,    # 60% of stocks in US
+    "VXUS": 0.24,   # 40% of stocks international
+    "BND": 0.21,    # 70% of bonds in US
+    "BNDX": 0.09,   # 30% of bonds international
+    "VNQ": 0.05,    # 50% of alternatives in real estate
+    "GSG": 0.05     # 50% of alternatives in commodities
+}
+TARGET_SYMBOLS: Final[Tuple[str, ...]] = tuple(TARGET_ALLOCATION)
+TARGET_SYMBOL_ARRAY: Final[np.ndarray] = np.array(TARGET_SYMBOLS)
+TARGET_WEIGHTS: Final[np.ndarray] = np.fromiter(TARGET_ALLOCATION.values(), dtype=np.float64, count=len(TARGET_SYMBOLS))
+
 class RiskAssessmentRequest(BaseModel):
     age: int
     income: float
@@ -96,26 +350,21 @@ class ScenarioRequest(BaseModel):
     time_horizon: int
     initial_investment: float
 
-# Dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+ROOT_RESPONSE = StaticJSONResponse({"message": "Welcome to Robo Advisor API"})
+HEALTH_RESPONSE = StaticJSONResponse({"status": "healthy"}, max_age=1)
 
-@app.get("/")
-async def root():
-    return {"message": "Welcome to Robo Advisor API"}
+@meta_router.get("/")
+async def root(request: Request):
+    return ROOT_RESPONSE(request)
 
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy"}
+@meta_router.get("/health")
+async def health_check(request: Request):
+    return HEALTH_RESPONSE(request)
 
-@app.post("/api/risk-assessment")
-async def process_risk_assessment(data: RiskAssessmentRequest):
+@advisor_router.post("/risk-assessment", openapi_extra=json_body_openapi(RiskAssessmentRequest))
+async def process_risk_assessment(data: RiskAssessmentRequest = json_body(RiskAssessmentRequest)):
     try:
-        logger.info(f"Received risk assessment request: {data}")
+        logger.info("Received risk assessment request: %s", data)
         
         # Calculate risk level based on inputs
         risk_score = (
@@ -124,66 +373,18 @@ async def process_risk_assessment(data: RiskAssessmentRequest):
             (data.investment_horizon / 30) * 0.4
         )
         
-        logger.info(f"Calculated risk score: {risk_score}")
+        logger.info("Calculated risk score: %s", risk_score)
         
         # Determine risk level
-        if risk_score < 0.3:
-            risk_level = "conservative"
-        elif risk_score < 0.5:
-            risk_level = "moderate_conservative"
-        elif risk_score < 0.7:
-            risk_level = "moderate"
-        elif risk_score < 0.8:
-            risk_level = "moderate_aggressive"
-        else:
-            risk_level = "aggressive"
-
-        logger.info(f"Determined risk level: {risk_level}")
-
-        # Get risk summary based on risk level
-        risk_summaries = {
-            "conservative": {
-                "description": "Focus on preserving capital with modest growth potential",
-                "suitable_for": "Investors close to retirement or with low risk tolerance",
-                "expected_return": "4-6% annually",
-                "volatility": "Low",
-                "investment_horizon": "1-3 years"
-            },
-            "moderate_conservative": {
-                "description": "Balanced approach with emphasis on stability",
-                "suitable_for": "Investors seeking steady growth with limited volatility",
-                "expected_return": "5-7% annually",
-                "volatility": "Low to Medium",
-                "investment_horizon": "3-5 years"
-            },
-            "moderate": {
-                "description": "Balance between growth and stability",
-                "suitable_for": "Investors comfortable with market fluctuations",
-                "expected_return": "6-8% annually",
-                "volatility": "Medium",
-                "investment_horizon": "5-10 years"
-            },
-            "moderate_aggressive": {
-                "description": "Growth-oriented with higher risk tolerance",
-                "suitable_for": "Long-term investors seeking capital appreciation",
-                "expected_return": "7-9% annually",
-                "volatility": "Medium to High",
-                "investment_horizon": "10-15 years"
-            },
-            "aggressive": {
-                "description": "Maximum growth potential with high risk tolerance",
-                "suitable_for": "Young investors with long time horizons",
-                "expected_return": "8-10%+ annually",
-                "volatility": "High",
-                "investment_horizon": "15+ years"
-            }
-        }
+        risk_level = RISK_LEVELS[bisect_right(RISK_LEVEL_THRESHOLDS, risk_score)]
+
+        logger.info("Determined risk level: %s", risk_level)
 
         result = {
             "risk_level": risk_level,
             "risk_score": risk_score,
             "investment_goals": data.investment_goals,
-            "risk_summary": risk_summaries[risk_level],
+            "risk_summary": RISK_SUMMARIES[risk_level],
             "recommended_allocation": {
                 "stocks": min(0.8, 0.3 + risk_score),
                 "bonds": max(0.2, 0.7 - risk_score),
@@ -191,16 +392,16 @@ async def process_risk_assessment(data: RiskAssessmentRequest):
             }
         }
 
-        logger.info(f"Sending response: {result}")
+        logger.info("Sending response: %s", result)
         return result
     except Exception as e:
-        logger.error(f"Error processing risk assessment: {str(e)}", exc_info=True)
+        logger.error("Error processing risk assessment: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/portfolio")
-async def create_portfolio(data: PortfolioCreate):
+@portfolio_router.post("", openapi_extra=json_body_openapi(PortfolioCreate))
+async def create_portfolio(data: PortfolioCreate = json_body(PortfolioCreate)):
     try:
-        logger.info(f"Received portfolio creation request: {data}")
+        logger.info("Received portfolio creation request: %s", data)
         
         # For now, we'll create a simple portfolio with a hardcoded ID
         # In a real application, this would create a record in the database
@@ -239,144 +440,152 @@ async def create_portfolio(data: PortfolioCreate):
             ]
         }
         
-        logger.info(f"Sending portfolio response: {portfolio}")
+        logger.info("Sending portfolio response: %s", portfolio)
         return portfolio
     except Exception as e:
-        logger.error(f"Error creating portfolio: {str(e)}", exc_info=True)
+        logger.error("Error creating portfolio: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/portfolio/{portfolio_id}/stats")
-async def get_portfolio_stats(portfolio_id: int):
-    try:
-        # For now, return mock data
-        # In a real application, this would fetch from the database
-        return {
-            "expected_annual_return": 0.08,
-            "annual_volatility": 0.15,
-            "sharpe_ratio": 0.53,
-            "max_drawdown": 0.12,
-            "investment_amount": 100000,
-            "estimated_annual_income": 2.5  # 2.5 ten thousand dollars = $25,000
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+# Mock portfolio statistics; in a real application these would be calculated from the database
+STATS_RESPONSE = StaticJSONResponse({
+    "expected_annual_return": 0.08,
+    "annual_volatility": 0.15,
+    "sharpe_ratio": 0.53,
+    "max_drawdown": 0.12,
+    "investment_amount": 100000,
+    "estimated_annual_income": 2.5  # 2.5 ten thousand dollars = $25,000
+})
+
+@portfolio_router.get("/{portfolio_id}/stats")
+async def get_portfolio_stats(portfolio_id: int, request: Request):
+    return STATS_RESPONSE(request)
 
-@app.get("/api/portfolio/{portfolio_id}")
-async def get_portfolio(portfolio_id: int):
+def mock_portfolio(portfolio_id: int) -> Dict[str, Any]:
+    """
+    Mock portfolio details.
+    In a real application, this would fetch from the database.
+    """
+    return {
+        "id": portfolio_id,
+        "risk_level": "moderate",
+        "investment_goals": ["growth", "income"],
+        "allocation": {
+            "stocks": 0.6,
+            "bonds": 0.3,
+            "alternatives": 0.1
+        },
+        "total_value": 100000,
+        "cash_balance": 10000,
+        "assets": [
+            {
+                "symbol": "VTI",
+                "allocation": 0.36,
+                "value": 36000,
+                "shares": 180
+            },
+            {
+                "symbol": "VXUS",
+                "allocation": 0.24,
+                "value": 24000,
+                "shares": 480
+            },
+            {
+                "symbol": "BND",
+                "allocation": 0.21,
+                "value": 21000,
+                "shares": 210
+            },
+            {
+                "symbol": "BNDX",
+                "allocation": 0.09,
+                "value": 9000,
+                "shares": 90
+            }
+        ]
+    }
+
+@lru_cache(maxsize=1024)
+def mock_portfolio_allocation(portfolio_id: int) -> Dict[str, float]:
+    """Symbol to allocation mapping of a (mock) portfolio; treat the result as read-only."""
+    return {asset["symbol"]: asset["allocation"] for asset in mock_portfolio(portfolio_id)["assets"]}
+
+@lru_cache(maxsize=1024)
+def mock_portfolio_response(portfolio_id: int) -> StaticJSONResponse:
+    """Encoded mock portfolio, built once per portfolio id."""
+    return StaticJSONResponse(mock_portfolio(portfolio_id))
+
+@portfolio_router.get("/{portfolio_id}")
+async def get_portfolio(portfolio_id: int, request: Request):
     try:
         # For now, return mock data
-        # In a real application, this would fetch from the database
-        return {
-            "id": portfolio_id,
-            "risk_level": "moderate",
-            "investment_goals": ["growth", "income"],
-            "allocation": {
-                "stocks": 0.6,
-                "bonds": 0.3,
-                "alternatives": 0.1
-            },
-            "total_value": 100000,
-            "cash_balance": 10000,
-            "assets": [
-                {
-                    "symbol": "VTI",
-                    "allocation": 0.36,
-                    "value": 36000,
-                    "shares": 180
-                },
-                {
-                    "symbol": "VXUS",
-                    "allocation": 0.24,
-                    "value": 24000,
-                    "shares": 480
-                },
-                {
-                    "symbol": "BND",
-                    "allocation": 0.21,
-                    "value": 21000,
-                    "shares": 210
-                },
-                {
-                    "symbol": "BNDX",
-                    "allocation": 0.09,
-                    "value": 9000,
-                    "shares": 90
-                }
-            ]
-        }
+        return mock_portfolio_response(portfolio_id)(request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/portfolio/rebalance")
-async def rebalance_portfolio(data: RebalanceRequest):
+@portfolio_router.post("/rebalance", openapi_extra=json_body_openapi(RebalanceRequest))
+async def rebalance_portfolio(data: RebalanceRequest = json_body(RebalanceRequest)):
     try:
-        logger.info(f"Received rebalance request for portfolio {data.portfolio_id}")
-        logger.info(f"Current allocation: {data.current_allocation}")
+        logger.info("Received rebalance request for portfolio %s", data.portfolio_id)
+        logger.info("Current allocation: %s", data.current_allocation)
         
-        # For now, we'll use a simple rebalancing strategy
+        # For now, we'll use a simple rebalancing strategy towards TARGET_ALLOCATION
         # In a real application, this would use the PortfolioManager class
-        target_allocation = {
-            "VTI": 0.36,    # 60% of stocks in US
-            "VXUS": 0.24,   # 40% of stocks international
-            "BND": 0.21,    # 70% of bonds in US
-            "BNDX": 0.09,   # 30% of bonds international
-            "VNQ": 0.05,    # 50% of alternatives in real estate
-            "GSG": 0.05     # 50% of alternatives in commodities
-        }
-        
-        # Calculate the trades needed
-        trades = {}
-        for symbol, target in target_allocation.items():
-            current = data.current_allocation.get(symbol, 0)
-            diff = target - current
-            if abs(diff) > 0.01:  # Only trade if difference is more than 1%
-                trades[symbol] = diff
+        current = np.fromiter(
+            (data.current_allocation.get(symbol, 0.0) for symbol in TARGET_SYMBOLS),
+            dtype=np.float64,
+            count=len(TARGET_SYMBOLS)
+        )
+        # Only trade if difference is more than 1%
+        indices, diffs = rebalance_trades(TARGET_WEIGHTS, current, 0.01)
+        trades = dict(zip(TARGET_SYMBOL_ARRAY[indices].tolist(), diffs.tolist()))
         
-        logger.info(f"Calculated trades: {trades}")
+        logger.info("Calculated trades: %s", trades)
         
         # For now, return mock data
         return {
             "status": "success",
             "trades": trades,
-            "new_allocation": target_allocation,
+            "new_allocation": TARGET_ALLOCATION,
             "message": "Portfolio rebalanced successfully"
         }
     except Exception as e:
-        logger.error(f"Error rebalancing portfolio: {str(e)}", exc_info=True)
+        logger.error("Error rebalancing portfolio: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/portfolio/{portfolio_id}/performance")
-async def get_portfolio_performance(portfolio_id: int):
+@lru_cache(maxsize=1024)
+def mock_performance(portfolio_id: int, day: str) -> List[Dict]:
+    """
+    30 days of mock performance data ending on the given day.
+    Cached per portfolio and day, so it is generated once a day rather than per request.
+    """
+    dates = (np.datetime64(day, "D") - np.arange(30)).astype(str).tolist()
+    base_value = 100000
+
+    # Add some random variation to the portfolio value and the benchmark (e.g., S&P 500)
+    portfolio_values = np.round(base_value * (1 + rng.uniform(-0.02, 0.02, len(dates))), 2)
+    benchmark_values = np.round(base_value * (1 + rng.uniform(-0.015, 0.015, len(dates))), 2)
+
+    return [
+        {"date": d, "value": value, "benchmark": benchmark}
+        for d, value, benchmark in zip(dates, portfolio_values.tolist(), benchmark_values.tolist())
+    ]
+
+@portfolio_router.get("/{portfolio_id}/performance")
+async def get_portfolio_performance(portfolio_id: int, request: Request):
     try:
         # For now, return mock performance data
         # In a real application, this would calculate actual performance
-        from datetime import datetime, timedelta
-        import random
+        performance_data = mock_performance(portfolio_id, date.today().isoformat())
 
-        # Generate 30 days of mock data
-        dates = [(datetime.now() - timedelta(days=x)).strftime('%Y-%m-%d') for x in range(30)]
-        base_value = 100000
-        performance_data = []
-        
-        for date in dates:
-            # Add some random variation to the portfolio value
-            portfolio_value = base_value * (1 + random.uniform(-0.02, 0.02))
-            # Generate benchmark value (e.g., S&P 500)
-            benchmark_value = base_value * (1 + random.uniform(-0.015, 0.015))
-            
-            performance_data.append({
-                "date": date,
-                "value": round(portfolio_value, 2),
-                "benchmark": round(benchmark_value, 2)
-            })
-        
-        return performance_data
+        if wants_ndjson(request):
+            return ndjson_response(performance_data)
+        return json_array_response(performance_data)
     except Exception as e:
-        logger.error(f"Error getting portfolio performance: {str(e)}", exc_info=True)
+        logger.error("Error getting portfolio performance: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/portfolio/{portfolio_id}/transactions")
-async def get_portfolio_transactions(portfolio_id: int):
+@portfolio_router.get("/{portfolio_id}/transactions")
+async def get_portfolio_transactions(portfolio_id: int, request: Request):
     try:
         # For now, return mock transaction data
         # In a real application, this would fetch from the database
@@ -406,15 +615,29 @@ async def get_portfolio_transactions(portfolio_id: int):
                 "timestamp": "2024-03-18T10:00:00Z"
             }
         ]
-        return transactions
+        if wants_ndjson(request):
+            return ndjson_response(transactions)
+        return NumpyORJSONResponse(transactions)
     except Exception as e:
-        logger.error(f"Error fetching transactions: {str(e)}", exc_info=True)
+        logger.error("Error fetching transactions: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/portfolio/transactions")
-async def create_transaction(data: TransactionCreate):
+# [epoch second, ISO string] of the last formatted timestamp; only touched from the event loop
+_utc_timestamp_cache: List[Any] = [0, ""]
+
+def utc_timestamp() -> str:
+    """Current UTC time in ISO format at second resolution, formatted at most once per second."""
+    now = int(time.time())
+    cache = _utc_timestamp_cache
+    if cache[0] != now:
+        cache[0] = now
+        cache[1] = datetime.utcfromtimestamp(now).isoformat()
+    return cache[1]
+
+@portfolio_router.post("/transactions", openapi_extra=json_body_openapi(TransactionCreate))
+async def create_transaction(data: TransactionCreate = json_body(TransactionCreate)):
     try:
-        logger.info(f"Creating transaction: {data}")
+        logger.info("Creating transaction: %s", data)
         # In a real application, this would create a record in the database
         transaction = {
             "id": 1,  # This would come from the database
@@ -422,15 +645,15 @@ async def create_transaction(data: TransactionCreate):
             "symbol": data.symbol,
             "shares": data.shares,
             "price": data.price,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": utc_timestamp()
         }
         return transaction
     except Exception as e:
-        logger.error(f"Error creating transaction: {str(e)}", exc_info=True)
+        logger.error("Error creating transaction: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/goals")
-async def get_goals():
+@goals_router.get("")
+async def get_goals(request: Request):
     try:
         # For now, return mock goal data
         # In a real application, this would fetch from the database
@@ -452,15 +675,15 @@ async def get_goals():
                 "type": "house"
             }
         ]
-        return goals
+        return cacheable_response(request, goals)
     except Exception as e:
-        logger.error(f"Error fetching goals: {str(e)}", exc_info=True)
+        logger.error("Error fetching goals: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/goals")
-async def create_goal(data: GoalCreate):
+@goals_router.post("", openapi_extra=json_body_openapi(GoalCreate))
+async def create_goal(data: GoalCreate = json_body(GoalCreate)):
     try:
-        logger.info(f"Creating goal: {data}")
+        logger.info("Creating goal: %s", data)
         # In a real application, this would create a record in the database
         goal = {
             "id": 1,  # This would come from the database
@@ -472,13 +695,13 @@ async def create_goal(data: GoalCreate):
         }
         return goal
     except Exception as e:
-        logger.error(f"Error creating goal: {str(e)}", exc_info=True)
+        logger.error("Error creating goal: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.put("/api/goals/{goal_id}")
-async def update_goal(goal_id: int, data: GoalCreate):
+@goals_router.put("/{goal_id}", openapi_extra=json_body_openapi(GoalCreate))
+async def update_goal(goal_id: int, data: GoalCreate = json_body(GoalCreate)):
     try:
-        logger.info(f"Updating goal {goal_id}: {data}")
+        logger.info("Updating goal %s: %s", goal_id, data)
         # In a real application, this would update a record in the database
         goal = {
             "id": goal_id,
@@ -490,23 +713,23 @@ async def update_goal(goal_id: int, data: GoalCreate):
         }
         return goal
     except Exception as e:
-        logger.error(f"Error updating goal: {str(e)}", exc_info=True)
+        logger.error("Error updating goal: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.delete("/api/goals/{goal_id}")
+@goals_router.delete("/{goal_id}")
 async def delete_goal(goal_id: int):
     try:
-        logger.info(f"Deleting goal {goal_id}")
+        logger.info("Deleting goal %s", goal_id)
         # In a real application, this would delete a record from the database
         return {"message": "Goal deleted successfully"}
     except Exception as e:
-        logger.error(f"Error deleting goal: {str(e)}", exc_info=True)
+        logger.error("Error deleting goal: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/portfolio/{portfolio_id}/tax-loss-harvest")
-async def get_tax_loss_opportunities(portfolio_id: int):
+@portfolio_router.get("/{portfolio_id}/tax-loss-harvest")
+async def get_tax_loss_opportunities(portfolio_id: int, portfolio_manager: PortfolioManager = Depends(get_portfolio_manager)):
     try:
-        logger.info(f"Fetching tax loss opportunities for portfolio {portfolio_id}")
+        logger.info("Fetching tax loss opportunities for portfolio %s", portfolio_id)
         
         # Get current prices (mock data for now)
         current_prices = {
@@ -525,26 +748,25 @@ async def get_tax_loss_opportunities(portfolio_id: int):
             {"symbol": "BND", "price": 75.30, "shares": 150},
         ]
         
-        portfolio_manager = PortfolioManager()
         opportunities = portfolio_manager.calculate_tax_loss_harvest(transactions, current_prices)
         
-        # Add current prices to the opportunities
+        # Add current and purchase prices to the opportunities
+        # Reversed so the first lot's price per symbol wins, like the scan over transactions it replaced
+        purchase_prices = {t["symbol"]: t["price"] for t in reversed(transactions)}
         for opp in opportunities:
             opp["current_price"] = current_prices[opp["symbol"]]
-            opp["purchase_price"] = next(
-                t["price"] for t in transactions if t["symbol"] == opp["symbol"]
-            )
+            opp["purchase_price"] = purchase_prices[opp["symbol"]]
         
-        logger.info(f"Found {len(opportunities)} tax loss harvesting opportunities")
+        logger.info("Found %s tax loss harvesting opportunities", len(opportunities))
         return {"opportunities": opportunities}
     except Exception as e:
-        logger.error(f"Error calculating tax loss opportunities: {str(e)}", exc_info=True)
+        logger.error("Error calculating tax loss opportunities: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/portfolio/{portfolio_id}/tax-loss-harvest")
-async def execute_tax_loss_harvest(portfolio_id: int, data: TaxLossHarvestRequest):
+@portfolio_router.post("/{portfolio_id}/tax-loss-harvest", openapi_extra=json_body_openapi(TaxLossHarvestRequest))
+async def execute_tax_loss_harvest(portfolio_id: int, data: TaxLossHarvestRequest = json_body(TaxLossHarvestRequest)):
     try:
-        logger.info(f"Executing tax loss harvest for portfolio {portfolio_id}, symbol {data.symbol}")
+        logger.info("Executing tax loss harvest for portfolio %s, symbol %s", portfolio_id, data.symbol)
         
         # In a real application, this would:
         # 1. Sell the losing position
@@ -558,361 +780,500 @@ async def execute_tax_loss_harvest(portfolio_id: int, data: TaxLossHarvestReques
             "realized_loss": 1000  # Mock data
         }
     except Exception as e:
-        logger.error(f"Error executing tax loss harvest: {str(e)}", exc_info=True)
+        logger.error("Error executing tax loss harvest: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/news")
-async def get_news():
-    try:
-        logger.info("Fetching market news")
-        # In a real application, this would fetch from a news API
-        # For now, return mock data
-        news = [
-            {
-                "id": 1,
-                "title": "Market Rally Continues as Tech Stocks Lead Gains",
-                "summary": "Major indices posted strong gains today as technology companies reported better-than-expected earnings.",
-                "source": "Financial Times",
-                "url": "https://example.com/news/1",
-                "category": "Market Analysis",
-                "published_at": "2024-03-20T10:00:00Z"
-            },
-            {
-                "id": 2,
-                "title": "Federal Reserve Maintains Interest Rates",
-                "summary": "The Federal Reserve kept interest rates unchanged, citing stable inflation and continued economic growth.",
-                "source": "Reuters",
-                "url": "https://example.com/news/2",
-                "category": "Economic News",
-                "published_at": "2024-03-19T15:30:00Z"
-            },
-            {
-                "id": 3,
-                "title": "New ESG Investment Guidelines Released",
-                "summary": "Regulatory body releases updated guidelines for environmental, social, and governance investments.",
-                "source": "Bloomberg",
-                "url": "https://example.com/news/3",
-                "category": "ESG",
-                "published_at": "2024-03-18T09:15:00Z"
-            }
-        ]
-        return {"news": news}
-    except Exception as e:
-        logger.error(f"Error fetching news: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+# Mock market news; in a real application this would come from a news API
+NEWS_RESPONSE = StaticJSONResponse({
+    "news": [
+        {
+            "id": 1,
+            "title": "Market Rally Continues as Tech Stocks Lead Gains",
+            "summary": "Major indices posted strong gains today as technology companies reported better-than-expected earnings.",
+            "source": "Financial Times",
+            "url": "https://example.com/news/1",
+            "category": "Market Analysis",
+            "published_at": "2024-03-20T10:00:00Z"
+        },
+        {
+            "id": 2,
+            "title": "Federal Reserve Maintains Interest Rates",
+            "summary": "The Federal Reserve kept interest rates unchanged, citing stable inflation and continued economic growth.",
+            "source": "Reuters",
+            "url": "https://example.com/news/2",
+            "category": "Economic News",
+            "published_at": "2024-03-19T15:30:00Z"
+        },
+        {
+            "id": 3,
+            "title": "New ESG Investment Guidelines Released",
+            "summary": "Regulatory body releases updated guidelines for environmental, social, and governance investments.",
+            "source": "Bloomberg",
+            "url": "https://example.com/news/3",
+            "category": "ESG",
+            "published_at": "2024-03-18T09:15:00Z"
+        }
+    ]
+})
 
-@app.get("/api/education")
-async def get_educational_content():
-    try:
-        logger.info("Fetching educational content")
-        # In a real application, this would fetch from a content management system
-        # For now, return mock data
-        content = [
-            {
-                "id": 1,
-                "title": "Understanding Asset Allocation",
-                "description": "Learn the fundamentals of portfolio diversification and how to create a balanced investment strategy.",
-                "category": "Portfolio Management",
-                "difficulty": "beginner",
-                "reading_time": 5
-            },
-            {
-                "id": 2,
-                "title": "Advanced Options Trading Strategies",
-                "description": "Explore sophisticated options trading techniques and risk management strategies.",
-                "category": "Trading",
-                "difficulty": "advanced",
-                "reading_time": 15
-            },
-            {
-                "id": 3,
-                "title": "Tax-Efficient Investing Guide",
-                "description": "Understanding tax implications of different investment strategies and how to minimize your tax burden.",
-                "category": "Tax Planning",
-                "difficulty": "intermediate",
-                "reading_time": 8
-            },
-            {
-                "id": 4,
-                "title": "Market Analysis Fundamentals",
-                "description": "Learn how to analyze market trends, read financial statements, and make informed investment decisions.",
-                "category": "Analysis",
-                "difficulty": "beginner",
-                "reading_time": 10
-            }
-        ]
-        return {"content": content}
-    except Exception as e:
-        logger.error(f"Error fetching educational content: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+@advisor_router.get("/news")
+async def get_news(request: Request):
+    logger.info("Fetching market news")
+    return NEWS_RESPONSE(request)
+
+# Mock educational content; in a real application this would come from a content management system
+EDUCATION_RESPONSE = StaticJSONResponse({
+    "content": [
+        {
+            "id": 1,
+            "title": "Understanding Asset Allocation",
+            "description": "Learn the fundamentals of portfolio diversification and how to create a balanced investment strategy.",
+            "category": "Portfolio Management",
+            "difficulty": "beginner",
+            "reading_time": 5
+        },
+        {
+            "id": 2,
+            "title": "Advanced Options Trading Strategies",
+            "description": "Explore sophisticated options trading techniques and risk management strategies.",
+            "category": "Trading",
+            "difficulty": "advanced",
+            "reading_time": 15
+        },
+        {
+            "id": 3,
+            "title": "Tax-Efficient Investing Guide",
+            "description": "Understanding tax implications of different investment strategies and how to minimize your tax burden.",
+            "category": "Tax Planning",
+            "difficulty": "intermediate",
+            "reading_time": 8
+        },
+        {
+            "id": 4,
+            "title": "Market Analysis Fundamentals",
+            "description": "Learn how to analyze market trends, read financial statements, and make informed investment decisions.",
+            "category": "Analysis",
+            "difficulty": "beginner",
+            "reading_time": 10
+        }
+    ]
+})
+
+@advisor_router.get("/education")
+async def get_educational_content(request: Request):
+    logger.info("Fetching educational content")
+    return EDUCATION_RESPONSE(request)
+
+# Encoded efficient frontier keyed by the day it was calculated; a new day evicts the previous one
+_efficient_frontier_cache: TTLCache[str, bytes] = TTLCache(maxsize=1, ttl=86400)
+
+async def efficient_frontier_body(portfolio_manager: PortfolioManager, day: str) -> bytes:
+    """
+    Efficient frontier encoded as JSON, calculated at most once per day.
+    It only depends on the daily price history, not on the requested portfolio.
+    """
+    body = _efficient_frontier_cache.get(day)
+    if body is not None:
+        return body
+    
+    efficient_frontier = await run_in_executor(portfolio_manager.calculate_efficient_frontier)
+    logger.info("Calculated efficient frontier with %s points", len(efficient_frontier))
+    
+    # Log a sample point for debugging
+    if efficient_frontier:
+        logger.info("Sample portfolio point: %s", efficient_frontier[0])
+    
+    body = orjson.dumps({"efficient_frontier": efficient_frontier}, option=orjson.OPT_SERIALIZE_NUMPY)
+    # An empty frontier means the price history was unavailable; calculate it again next time
+    if efficient_frontier:
+        _efficient_frontier_cache[day] = body
+    return body
 
-@app.get("/api/portfolio/{portfolio_id}/efficient-frontier")
-async def get_efficient_frontier(portfolio_id: int):
+@portfolio_router.get("/{portfolio_id}/efficient-frontier")
+async def get_efficient_frontier(portfolio_id: int, portfolio_manager: PortfolioManager = Depends(get_portfolio_manager)):
     try:
-        logger.info(f"Starting efficient frontier calculation for portfolio {portfolio_id}")
-        portfolio_manager = PortfolioManager()
-        logger.info("Created PortfolioManager instance")
-        
-        efficient_frontier = portfolio_manager.calculate_efficient_frontier()
-        logger.info(f"Calculated efficient frontier with {len(efficient_frontier)} points")
-        
-        # Log a sample point for debugging
-        if efficient_frontier:
-            logger.info(f"Sample portfolio point: {efficient_frontier[0]}")
-        
-        return {"efficient_frontier": efficient_frontier}
+        logger.info("Fetching efficient frontier for portfolio %s", portfolio_id)
+        return Response(await efficient_frontier_body(portfolio_manager, date.today().isoformat()), media_type="application/json")
     except Exception as e:
-        logger.error(f"Error calculating efficient frontier: {str(e)}", exc_info=True)
+        logger.error("Error calculating efficient frontier: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/portfolio/{portfolio_id}/simulate")
-async def simulate_portfolio(portfolio_id: int, data: SimulationRequest):
+@portfolio_router.post("/{portfolio_id}/simulate", openapi_extra=json_body_openapi(SimulationRequest))
+async def simulate_portfolio(
+    portfolio_id: int,
+    data: SimulationRequest = json_body(SimulationRequest),
+    portfolio_manager: PortfolioManager = Depends(get_portfolio_manager)
+):
     try:
-        logger.info(f"Starting portfolio simulation for portfolio {portfolio_id}")
-        portfolio_manager = PortfolioManager()
+        logger.info("Starting portfolio simulation for portfolio %s", portfolio_id)
         
         # Get current portfolio allocation
-        portfolio = await get_portfolio(portfolio_id)
-        current_allocation = {asset["symbol"]: asset["allocation"] for asset in portfolio["assets"]}
+        current_allocation = mock_portfolio_allocation(portfolio_id)
         
         # Run simulation
-        simulation_results = portfolio_manager.simulate_portfolio(
+        simulation_results = await run_in_executor(
+            portfolio_manager.simulate_portfolio,
             current_allocation,
             data.initial_investment,
             data.monthly_contribution,
             data.time_horizon
         )
         
-        logger.info(f"Simulation completed with {len(simulation_results)} data points")
-        return {"simulation_results": simulation_results}
+        logger.info("Simulation completed with %s data points", len(simulation_results))
+        return json_array_response(simulation_results, "simulation_results")
     except Exception as e:
-        logger.error(f"Error running portfolio simulation: {str(e)}", exc_info=True)
+        logger.error("Error running portfolio simulation: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/portfolio/{portfolio_id}/backtest")
-async def backtest_portfolio(portfolio_id: int, data: BacktestRequest):
+@portfolio_router.post("/{portfolio_id}/backtest", openapi_extra=json_body_openapi(BacktestRequest))
+async def backtest_portfolio(
+    portfolio_id: int,
+    data: BacktestRequest = json_body(BacktestRequest),
+    portfolio_manager: PortfolioManager = Depends(get_portfolio_manager)
+):
     try:
-        logger.info(f"Starting portfolio backtest for portfolio {portfolio_id}")
-        portfolio_manager = PortfolioManager()
+        logger.info("Starting portfolio backtest for portfolio %s", portfolio_id)
         
         # Run backtest
-        backtest_results = portfolio_manager.backtest_portfolio(
+        backtest_results = await run_in_executor(
+            portfolio_manager.backtest_portfolio,
             data.allocation,
             data.initial_investment,
             data.time_horizon
         )
         
-        logger.info(f"Backtest completed with {len(backtest_results)} data points")
-        return {"backtest_results": backtest_results}
+        logger.info("Backtest completed with %s data points", len(backtest_results))
+        return json_array_response(backtest_results, "backtest_results")
     except Exception as e:
-        logger.error(f"Error running portfolio backtest: {str(e)}", exc_info=True)
+        logger.error("Error running portfolio backtest: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/portfolio/{portfolio_id}/analyze-scenario")
-async def analyze_scenario(portfolio_id: int, data: ScenarioRequest):
+@portfolio_router.post("/{portfolio_id}/analyze-scenario", openapi_extra=json_body_openapi(ScenarioRequest))
+async def analyze_scenario(
+    portfolio_id: int,
+    data: ScenarioRequest = json_body(ScenarioRequest),
+    portfolio_manager: PortfolioManager = Depends(get_portfolio_manager)
+):
     try:
-        logger.info(f"Starting scenario analysis for portfolio {portfolio_id}")
-        portfolio_manager = PortfolioManager()
+        logger.info("Starting scenario analysis for portfolio %s", portfolio_id)
         
         # Run scenario analysis
-        scenario_results = portfolio_manager.analyze_scenario(
+        scenario_results = await run_in_executor(
+            portfolio_manager.analyze_scenario,
             data.allocation,
             data.initial_investment,
             data.time_horizon
         )
         
         logger.info("Scenario analysis completed successfully")
-        return scenario_results
+        return NumpyORJSONResponse(scenario_results)
     except Exception as e:
-        logger.error(f"Error running scenario analysis: {str(e)}", exc_info=True)
+        logger.error("Error running scenario analysis: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 # Self-defined portfolio endpoints
-@app.post("/api/self-defined-portfolios/", response_model=schemas.SelfDefinedPortfolio)
-def create_self_defined_portfolio(
+async def load_self_defined_portfolio(
+    db: AsyncSession,
+    portfolio_id: int,
+    populate_existing: bool = False
+) -> models.SelfDefinedPortfolio:
+    """
+    Fetch a self-defined portfolio with its assets loaded, or raise a 404.
+    Pass populate_existing after writing rows behind the session's back.
+    """
+    portfolio = await db.get(models.SelfDefinedPortfolio, portfolio_id, populate_existing=populate_existing)
+    if not portfolio:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    return portfolio
+
+def self_defined_portfolio_out(portfolio: models.SelfDefinedPortfolio) -> schemas.SelfDefinedPortfolio:
+    """Build the response schema from a loaded row without re-validating trusted data."""
+    return schemas.SelfDefinedPortfolio.model_construct(
+        id=portfolio.id,
+        name=portfolio.name,
+        total_investment=portfolio.total_investment,
+        created_at=portfolio.created_at,
+        updated_at=portfolio.updated_at,
+        assets=[
+            schemas.SelfDefinedPortfolioAsset.model_construct(
+                id=asset.id,
+                portfolio_id=asset.portfolio_id,
+                symbol=asset.symbol,
+                allocation=asset.allocation,
+                shares=asset.shares,
+                value=asset.value
+            )
+            for asset in portfolio.assets
+        ]
+    )
+
+def self_defined_portfolio_response(portfolio: models.SelfDefinedPortfolio) -> Response:
+    """
+    Serialize a portfolio with pydantic-core directly.
+    The routes document their schema through `responses` instead of `response_model`,
+    which would dump and validate the returned model a second time.
+    """
+    return Response(self_defined_portfolio_out(portfolio).model_dump_json(), media_type="application/json")
+
+async def insert_self_defined_assets(
+    db: AsyncSession,
+    portfolio_id: int,
+    assets: List[schemas.SelfDefinedPortfolioAssetCreate]
+) -> None:
+    """Insert all assets of a portfolio with a single executemany statement."""
+    if assets:
+        await db.execute(
+            insert(models.SelfDefinedPortfolioAsset),
+            [
+                {
+                    "portfolio_id": portfolio_id,
+                    "symbol": asset.symbol,
+                    "allocation": asset.allocation,
+                    "shares": asset.shares,
+                    "value": asset.value
+                }
+                for asset in assets
+            ]
+        )
+
+async def load_self_defined_allocations(
+    db: AsyncSession,
+    portfolio_ids: List[int]
+) -> Dict[int, Tuple[str, Dict[str, float]]]:
+    """
+    Name and {symbol: allocation} of each existing portfolio among portfolio_ids.
+    Reads just those columns with one joined query instead of loading portfolio and asset rows.
+    """
+    rows = await db.execute(
+        select(
+            models.SelfDefinedPortfolio.id,
+            models.SelfDefinedPortfolio.name,
+            models.SelfDefinedPortfolioAsset.symbol,
+            models.SelfDefinedPortfolioAsset.allocation
+        )
+        .outerjoin(models.SelfDefinedPortfolio.assets)
+        .where(models.SelfDefinedPortfolio.id.in_(portfolio_ids))
+    )
+    portfolios: Dict[int, Tuple[str, Dict[str, float]]] = {}
+    for portfolio_id, name, symbol, allocation in rows:
+        assets = portfolios.setdefault(portfolio_id, (name, {}))[1]
+        if symbol is not None:  # Outer join row of a portfolio without assets
+            assets[symbol] = allocation
+    return portfolios
+
+SELF_DEFINED_PORTFOLIO_LIST = TypeAdapter(List[schemas.SelfDefinedPortfolio])
+
+@self_defined_router.post("/", responses={200: {"model": schemas.SelfDefinedPortfolio}})
+async def create_self_defined_portfolio(
     portfolio: schemas.SelfDefinedPortfolioCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     db_portfolio = models.SelfDefinedPortfolio(
         name=portfolio.name,
         total_investment=portfolio.total_investment
     )
     db.add(db_portfolio)
-    db.commit()
-    db.refresh(db_portfolio)
-    
-    # Add assets
-    for asset in portfolio.assets:
-        db_asset = models.SelfDefinedPortfolioAsset(
-            portfolio_id=db_portfolio.id,
-            symbol=asset.symbol,
-            allocation=asset.allocation,
-            shares=asset.shares,
-            value=asset.value
-        )
-        db.add(db_asset)
-    
-    db.commit()
-    return db_portfolio
+    await db.flush()  # Assigns the id the asset rows reference
+    await insert_self_defined_assets(db, db_portfolio.id, portfolio.assets)
+    await db.commit()
+    return self_defined_portfolio_response(
+        await load_self_defined_portfolio(db, db_portfolio.id, populate_existing=True)
+    )
 
-@app.get("/api/self-defined-portfolios/", response_model=List[schemas.SelfDefinedPortfolio])
-def get_self_defined_portfolios(db: Session = Depends(get_db)):
-    return db.query(models.SelfDefinedPortfolio).all()
+@self_defined_router.get("/", responses={200: {"model": List[schemas.SelfDefinedPortfolio]}})
+async def get_self_defined_portfolios(db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(models.SelfDefinedPortfolio))
+    return Response(
+        SELF_DEFINED_PORTFOLIO_LIST.dump_json([self_defined_portfolio_out(p) for p in result.scalars()]),
+        media_type="application/json"
+    )
 
-@app.get("/api/self-defined-portfolios/{portfolio_id}", response_model=schemas.SelfDefinedPortfolio)
-def get_self_defined_portfolio(portfolio_id: int, db: Session = Depends(get_db)):
-    portfolio = db.query(models.SelfDefinedPortfolio).filter(models.SelfDefinedPortfolio.id == portfolio_id).first()
-    if not portfolio:
-        raise HTTPException(status_code=404, detail="Portfolio not found")
-    return portfolio
+@self_defined_router.get("/{portfolio_id}", responses={200: {"model": schemas.SelfDefinedPortfolio}})
+async def get_self_defined_portfolio(portfolio_id: int, db: AsyncSession = Depends(get_db)):
+    return self_defined_portfolio_response(await load_self_defined_portfolio(db, portfolio_id))
 
-@app.put("/api/self-defined-portfolios/{portfolio_id}", response_model=schemas.SelfDefinedPortfolio)
-def update_self_defined_portfolio(
+@self_defined_router.put("/{portfolio_id}", responses={200: {"model": schemas.SelfDefinedPortfolio}})
+async def update_self_defined_portfolio(
     portfolio_id: int,
     portfolio: schemas.SelfDefinedPortfolioUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    db_portfolio = db.query(models.SelfDefinedPortfolio).filter(models.SelfDefinedPortfolio.id == portfolio_id).first()
-    if not db_portfolio:
-        raise HTTPException(status_code=404, detail="Portfolio not found")
+    db_portfolio = await load_self_defined_portfolio(db, portfolio_id)
     
     # Update portfolio attributes
-    for key, value in portfolio.dict(exclude_unset=True).items():
+    for key, value in portfolio.model_dump(exclude_unset=True).items():
         if key != "assets":
             setattr(db_portfolio, key, value)
     
-    # Update assets if provided
+    # Replace assets if provided, one DELETE and one executemany INSERT
     if portfolio.assets:
-        # Remove existing assets
-        db.query(models.SelfDefinedPortfolioAsset).filter(
-            models.SelfDefinedPortfolioAsset.portfolio_id == portfolio_id
-        ).delete()
-        
-        # Add new assets
-        for asset in portfolio.assets:
-            db_asset = models.SelfDefinedPortfolioAsset(
-                portfolio_id=portfolio_id,
-                symbol=asset.symbol,
-                allocation=asset.allocation,
-                shares=asset.shares,
-                value=asset.value
-            )
-            db.add(db_asset)
+        await db.execute(
+            delete(models.SelfDefinedPortfolioAsset)
+            .where(models.SelfDefinedPortfolioAsset.portfolio_id == portfolio_id)
+        )
+        await insert_self_defined_assets(db, portfolio_id, portfolio.assets)
     
-    db.commit()
-    db.refresh(db_portfolio)
-    return db_portfolio
+    await db.commit()
+    return self_defined_portfolio_response(
+        await load_self_defined_portfolio(db, portfolio_id, populate_existing=True)
+    )
 
-@app.delete("/api/self-defined-portfolios/{portfolio_id}")
-def delete_self_defined_portfolio(portfolio_id: int, db: Session = Depends(get_db)):
-    portfolio = db.query(models.SelfDefinedPortfolio).filter(models.SelfDefinedPortfolio.id == portfolio_id).first()
-    if not portfolio:
-        raise HTTPException(status_code=404, detail="Portfolio not found")
+@self_defined_router.delete("/{portfolio_id}")
+async def delete_self_defined_portfolio(portfolio_id: int, db: AsyncSession = Depends(get_db)):
+    portfolio = await load_self_defined_portfolio(db, portfolio_id)
     
-    db.delete(portfolio)
-    db.commit()
+    await db.delete(portfolio)
+    await db.commit()
     return {"message": "Portfolio deleted successfully"}
 
 # Portfolio simulation endpoints
-@app.post("/api/self-defined-portfolios/{portfolio_id}/simulate")
-def simulate_portfolio(
+@self_defined_router.post("/{portfolio_id}/simulate")
+async def simulate_portfolio(
     portfolio_id: int,
     simulation: schemas.PortfolioSimulationCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    portfolio_manager: PortfolioManager = Depends(get_portfolio_manager)
 ):
-    portfolio = db.query(models.SelfDefinedPortfolio).filter(models.SelfDefinedPortfolio.id == portfolio_id).first()
-    if not portfolio:
+    # Get portfolio allocation
+    portfolios = await load_self_defined_allocations(db, [portfolio_id])
+    if portfolio_id not in portfolios:
         raise HTTPException(status_code=404, detail="Portfolio not found")
+    allocation = portfolios[portfolio_id][1]
     
-    # Get portfolio allocation
-    allocation = {asset.symbol: asset.allocation for asset in portfolio.assets}
+    # End the read transaction so no pooled connection is held during the simulation
+    await db.commit()
     
-    # Run simulation
-    portfolio_manager = PortfolioManager()
-    results = portfolio_manager.simulate_portfolio(
+    # Run simulation off the event loop; it downloads prices and is CPU heavy
+    results = await run_in_executor(
+        portfolio_manager.simulate_portfolio,
         allocation=allocation,
         initial_investment=simulation.initial_investment,
         monthly_contribution=simulation.monthly_contribution,
         time_horizon=simulation.time_horizon
     )
     
-    # Save simulation results
-    db_simulation = models.PortfolioSimulation(
-        portfolio_id=portfolio_id,
-        name=simulation.name,
-        time_horizon=simulation.time_horizon,
-        initial_investment=simulation.initial_investment,
-        monthly_contribution=simulation.monthly_contribution,
-        results=json.dumps(results)
-    )
-    db.add(db_simulation)
-    db.commit()
+    # Encode once: the stored bytes double as the response body
+    body = orjson.dumps(results, option=orjson.OPT_SERIALIZE_NUMPY)
     
-    return results
+    # Save simulation results with a single INSERT in its own transaction
+    async with db.begin():
+        await db.execute(
+            insert(models.PortfolioSimulation).values(
+                portfolio_id=portfolio_id,
+                name=simulation.name,
+                time_horizon=simulation.time_horizon,
+                initial_investment=simulation.initial_investment,
+                monthly_contribution=simulation.monthly_contribution,
+                results=body
+            )
+        )
+    
+    return Response(body, media_type="application/json")
 
-@app.get("/api/self-defined-portfolios/{portfolio_id}/simulations")
-def get_portfolio_simulations(portfolio_id: int, db: Session = Depends(get_db)):
-    simulations = db.query(models.PortfolioSimulation).filter(
-        models.PortfolioSimulation.portfolio_id == portfolio_id
-    ).all()
-    return simulations
+PORTFOLIO_SIMULATION_LIST = TypeAdapter(List[schemas.PortfolioSimulation])
+
+@self_defined_router.get("/{portfolio_id}/simulations", responses={200: {"model": List[schemas.PortfolioSimulation]}})
+async def get_portfolio_simulations(portfolio_id: int, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(
+        select(models.PortfolioSimulation).where(models.PortfolioSimulation.portfolio_id == portfolio_id)
+    )
+    # results stay a JSON string in the response; the stored orjson bytes already are one
+    return Response(
+        PORTFOLIO_SIMULATION_LIST.dump_json([
+            schemas.PortfolioSimulation.model_construct(
+                id=simulation.id,
+                portfolio_id=simulation.portfolio_id,
+                name=simulation.name,
+                time_horizon=simulation.time_horizon,
+                initial_investment=simulation.initial_investment,
+                monthly_contribution=simulation.monthly_contribution,
+                created_at=simulation.created_at,
+                results=simulation.results.decode()
+            )
+            for simulation in result.scalars()
+        ]),
+        media_type="application/json"
+    )
 
 # Portfolio comparison endpoint
-@app.post("/api/self-defined-portfolios/compare")
-def compare_portfolios(
+@self_defined_router.post("/compare")
+async def compare_portfolios(
     comparison: schemas.PortfolioComparison,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    portfolio_manager: PortfolioManager = Depends(get_portfolio_manager)
 ):
-    portfolio_manager = PortfolioManager()
     results = {}
     
-    for portfolio_id in comparison.portfolio_ids:
-        portfolio = db.query(models.SelfDefinedPortfolio).filter(
-            models.SelfDefinedPortfolio.id == portfolio_id
-        ).first()
-        if not portfolio:
-            continue
-        
-        # Get portfolio allocation
-        allocation = {asset.symbol: asset.allocation for asset in portfolio.assets}
-        
-        # Run simulation
-        simulation_results = portfolio_manager.simulate_portfolio(
-            allocation=allocation,
-            initial_investment=comparison.initial_investment,
-            monthly_contribution=comparison.monthly_contribution,
-            time_horizon=comparison.time_horizon
-        )
-        
-        results[portfolio.name] = simulation_results
+    portfolios = await load_self_defined_allocations(db, comparison.portfolio_ids)
+    compared = [portfolios[pid] for pid in comparison.portfolio_ids if pid in portfolios]
+    allocations = [allocation for _, allocation in compared]
+    
+    # End the read transaction so no pooled connection is held during the simulation
+    await db.commit()
     
-    return results
+    # Simulate all portfolios from a single price download on the portfolio thread pool
+    simulations = await run_in_executor(
+        portfolio_manager.simulate_portfolios,
+        allocations=allocations,
+        initial_investment=comparison.initial_investment,
+        monthly_contribution=comparison.monthly_contribution,
+        time_horizon=comparison.time_horizon
+    ) if compared else []
+    
+    for (name, _), simulation_results in zip(compared, simulations):
+        results[name] = simulation_results
+    
+    # Returned as a response so FastAPI skips its jsonable_encoder pass over every data point
+    return NumpyORJSONResponse(results)
+
+# Symbols offered for portfolio creation; they only change with a deploy
+AVAILABLE_SYMBOLS = (
+    "VTI",   # Vanguard Total Stock Market ETF
+    "VXUS",  # Vanguard Total International Stock ETF
+    "BND",   # Vanguard Total Bond Market ETF
+    "BNDX",  # Vanguard Total International Bond ETF
+    "VNQ",   # Vanguard Real Estate ETF
+    "GSG",   # iShares S&P GSCI Commodity ETF
+    "SPY",   # SPDR S&P 500 ETF
+    "QQQ",   # Invesco QQQ Trust
+    "IWM",   # iShares Russell 2000 ETF
+    "AGG",   # iShares Core U.S. Aggregate Bond ETF
+    "TLT",   # iShares 20+ Year Treasury Bond ETF
+    "GLD",   # SPDR Gold Trust
+    "SLV",   # iShares Silver Trust
+    "DIA",   # SPDR Dow Jones Industrial Average ETF
+    "XLF",   # Financial Select Sector SPDR Fund
+    "XLK",   # Technology Select Sector SPDR Fund
+    "XLE",   # Energy Select Sector SPDR Fund
+    "XLV",   # Health Care Select Sector SPDR Fund
+    "XLP",   # Consumer Staples Select Sector SPDR Fund
+    "XLY",   # Consumer Discretionary Select Sector SPDR Fund
+)
+AVAILABLE_SYMBOLS_RESPONSE = StaticJSONResponse(AVAILABLE_SYMBOLS, max_age=86400)
 
-@app.get("/api/available-symbols")
-def get_available_symbols():
+@advisor_router.get("/available-symbols")
+async def get_available_symbols(request: Request):
     """Get list of available symbols for portfolio creation."""
-    return [
-        "VTI",   # Vanguard Total Stock Market ETF
-        "VXUS",  # Vanguard Total International Stock ETF
-        "BND",   # Vanguard Total Bond Market ETF
-        "BNDX",  # Vanguard Total International Bond ETF
-        "VNQ",   # Vanguard Real Estate ETF
-        "GSG",   # iShares S&P GSCI Commodity ETF
-        "SPY",   # SPDR S&P 500 ETF
-        "QQQ",   # Invesco QQQ Trust
-        "IWM",   # iShares Russell 2000 ETF
-        "AGG",   # iShares Core U.S. Aggregate Bond ETF
-        "TLT",   # iShares 20+ Year Treasury Bond ETF
-        "GLD",   # SPDR Gold Trust
-        "SLV",   # iShares Silver Trust
-        "DIA",   # SPDR Dow Jones Industrial Average ETF
-        "XLF",   # Financial Select Sector SPDR Fund
-        "XLK",   # Technology Select Sector SPDR Fund
-        "XLE",   # Energy Select Sector SPDR Fund
-        "XLV",   # Health Care Select Sector SPDR Fund
-        "XLP",   # Consumer Staples Select Sector SPDR Fund
-        "XLY",   # Consumer Discretionary Select Sector SPDR Fund
-    ]
+    return AVAILABLE_SYMBOLS_RESPONSE(request)
+
+# Routers are matched in inclusion order, most requested first
+app.include_router(portfolio_router)
+app.include_router(self_defined_router)
+app.include_router(goals_router)
+app.include_router(advisor_router)
+app.include_router(meta_router)
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    if os.getenv("ENV") == "dev":
+        uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+    else:
+        # uvloop has no Windows build; httptools comes with uvicorn[standard] everywhere
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=8000,
+            workers=os.cpu_count(),
+            loop="asyncio" if sys.platform == "win32" else "uvloop",
+            http="httptools",
+            access_log=False
+        )
\ No newline at end of file
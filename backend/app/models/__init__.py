@@ -1,10 +1,11 @@
-from .models import User, RiskProfile, Portfolio, Transaction, Goal
+from .models import User, RiskProfile, Portfolio, PortfolioAllocation, Transaction, Goal
 from .portfolio import SelfDefinedPortfolio, SelfDefinedPortfolioAsset, PortfolioSimulation
 
 __all__ = [
     'User',
     'RiskProfile',
     'Portfolio',
+    'PortfolioAllocation',
     'Transaction',
     'Goal',
     'SelfDefinedPortfolio',
@@ -1,5 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, JSON, Enum
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, JSON, Enum, insert, select
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import relationship
+from typing import Dict, List, Union
 import enum
 from datetime import datetime
 from ..core.database import Base
@@ -47,13 +49,45 @@ class Portfolio(Base):
     name = Column(String)
     total_value = Column(Float)
     cash_balance = Column(Float)
-    allocation = Column(JSON)  # Store asset allocation as JSON
+    allocation = Column(JSON)  # Denormalized copy of allocations, kept for display
     last_rebalanced = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     user = relationship("User", back_populates="portfolios")
     transactions = relationship("Transaction", back_populates="portfolio")
+    allocations = relationship("PortfolioAllocation", back_populates="portfolio", cascade="all, delete-orphan")
+
+# One (symbol, weight) row per holding, so analytics read plain numbers instead of parsing JSON
+class PortfolioAllocation(Base):
+    __tablename__ = "portfolio_allocations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    portfolio_id = Column(Integer, ForeignKey("portfolios.id"), index=True)
+    symbol = Column(String)
+    weight = Column(Float)
+    
+    portfolio = relationship("Portfolio", back_populates="allocations")
+
+def migrate_portfolio_allocations(connection: Connection) -> List[Dict[str, Union[int, str, float]]]:
+    """
+    Create portfolio_allocations if missing and copy the JSON allocation of portfolios without
+    allocation rows into it. Safe to run on every startup; returns the rows written.
+    """
+    Base.metadata.create_all(bind=connection, tables=[Portfolio.__table__, PortfolioAllocation.__table__])
+    migrated = select(PortfolioAllocation.portfolio_id)
+    portfolios = connection.execute(
+        select(Portfolio.id, Portfolio.allocation).where(Portfolio.id.not_in(migrated))
+    ).all()
+    rows: List[Dict[str, Union[int, str, float]]] = [
+        {"portfolio_id": portfolio_id, "symbol": symbol, "weight": weight}
+        for portfolio_id, allocation in portfolios
+        # A JSON column stores a missing allocation as JSON null rather than SQL NULL
+        for symbol, weight in (allocation or {}).items()
+    ]
+    if rows:
+        connection.execute(insert(PortfolioAllocation), rows)
+    return rows
 
 class Transaction(Base):
     __tablename__ = "transactions"
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Index, LargeBinary, inspect
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..core.database import Base
+from .models import PortfolioAllocation
 
 class SelfDefinedPortfolio(Base):
     __tablename__ = "self_defined_portfolios"
@@ -12,15 +14,21 @@ class SelfDefinedPortfolio(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    # Relationships
-    assets = relationship("SelfDefinedPortfolioAsset", back_populates="portfolio", cascade="all, delete-orphan")
+    # Relationships; assets are always serialized with the portfolio, so load them
+    # for every queried portfolio in one extra IN query instead of lazily per row
+    assets = relationship(
+        "SelfDefinedPortfolioAsset",
+        back_populates="portfolio",
+        cascade="all, delete-orphan",
+        lazy="selectin"
+    )
     simulations = relationship("PortfolioSimulation", back_populates="portfolio", cascade="all, delete-orphan")
 
 class SelfDefinedPortfolioAsset(Base):
     __tablename__ = "self_defined_portfolio_assets"
 
     id = Column(Integer, primary_key=True, index=True)
-    portfolio_id = Column(Integer, ForeignKey("self_defined_portfolios.id"))
+    portfolio_id = Column(Integer, ForeignKey("self_defined_portfolios.id"), index=True)
     symbol = Column(String)
     allocation = Column(Float)
     shares = Column(Float)
@@ -31,6 +39,10 @@ class SelfDefinedPortfolioAsset(Base):
 
 class PortfolioSimulation(Base):
     __tablename__ = "portfolio_simulations"
+    # Serves both the per-portfolio listing (by its prefix) and latest-first lookups
+    __table_args__ = (
+        Index("ix_portfolio_simulations_portfolio_created", "portfolio_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     portfolio_id = Column(Integer, ForeignKey("self_defined_portfolios.id"))
@@ -41,7 +53,29 @@ class PortfolioSimulation(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Store simulation results as JSON
-    results = Column(String)  # Will store JSON string of simulation results
+    results = Column(LargeBinary)  # orjson-encoded bytes of the simulation results
     
     # Relationship
-    portfolio = relationship("SelfDefinedPortfolio", back_populates="simulations") 
\ No newline at end of file
+    portfolio = relationship("SelfDefinedPortfolio", back_populates="simulations")
+
+def migrate_simulation_results(connection: Connection) -> None:
+    """
+    Convert simulation results stored as JSON text before they became orjson bytes into blobs.
+    LargeBinary cannot read text values back, so this has to run before the rows are loaded.
+    """
+    if inspect(connection).has_table(PortfolioSimulation.__tablename__):
+        connection.exec_driver_sql(
+            "UPDATE portfolio_simulations SET results = CAST(results AS BLOB) WHERE typeof(results) = 'text'"
+        )
+
+def add_portfolio_indexes(connection: Connection) -> None:
+    """
+    Create the portfolio_id indexes on databases whose tables predate them.
+    create_all skips existing tables together with their indexes, so they are added one by one.
+    """
+    inspector = inspect(connection)
+    for table in (PortfolioAllocation.__table__, SelfDefinedPortfolioAsset.__table__,
+                  PortfolioSimulation.__table__):
+        if inspector.has_table(table.name):
+            for index in table.indexes:
+                index.create(bind=connection, checkfirst=True)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional, Dict
 from datetime import datetime
 
@@ -15,8 +15,7 @@ class SelfDefinedPortfolioAsset(SelfDefinedPortfolioAssetBase):
     id: int
     portfolio_id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class SelfDefinedPortfolioBase(BaseModel):
     name: str
@@ -36,8 +35,7 @@ class SelfDefinedPortfolio(SelfDefinedPortfolioBase):
     updated_at: Optional[datetime]
     assets: List[SelfDefinedPortfolioAsset]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class PortfolioSimulationBase(BaseModel):
     name: str
@@ -54,8 +52,7 @@ class PortfolioSimulation(PortfolioSimulationBase):
     created_at: datetime
     results: str
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class PortfolioComparison(BaseModel):
     portfolio_ids: List[int]
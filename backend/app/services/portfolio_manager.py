@@ -1,9 +1,115 @@
+import hashlib
+import logging
+import math
+import os
+import time
 import numpy as np
 import pandas as pd
 import yfinance as yf
-from typing import List, Dict, Tuple
+from yfinance.exceptions import YFException
+from cachetools import TTLCache
+from threading import Lock
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from scipy.optimize import minimize
+from .solvers import (
+    compound_with_contributions, frontier_basis, harvest_losses, max_drawdown, max_drawdown_of_returns,
+    negative_sharpe_ratio, portfolio_volatility, rebalance_trades, tangency_weights
+)
+
+try:
+    import cupy as cp
+except ImportError:  # GPU acceleration is optional
+    cp = None
+
+# Daily statistics are annualized over the trading days in a year
+TRADING_DAYS = 252
+SQRT_TRADING_DAYS = math.sqrt(TRADING_DAYS)
+
+# One simulated day: 24 bytes per row instead of a dict, turned into JSON-ready rows only at the boundary
+SIMULATION_DTYPE = np.dtype([("date", "datetime64[D]"), ("portfolioValue", np.float64), ("benchmarkValue", np.float64)])
+
+# Smallest eigenvalue allowed in an annualized covariance matrix before it is regularized
+MIN_COVARIANCE_EIGENVALUE = 1e-10
+
+# Universes larger than this compute their covariance matrix on the GPU when available
+GPU_COVARIANCE_MIN_ASSETS = 200
+
+# Latest prices move on a seconds-to-minutes scale, so share them across requests briefly
+_price_cache: TTLCache[str, float] = TTLCache(maxsize=1024, ttl=30)
+_price_cache_lock = Lock()
+
+# Daily price history changes at most once per trading day, dividend yields even less often
+HISTORY_TTL = 3600
+_history_cache: TTLCache[Tuple[Tuple[str, ...], str], pd.DataFrame] = TTLCache(maxsize=128, ttl=HISTORY_TTL)
+_history_cache_lock = Lock()
+_dividend_yield_cache: TTLCache[str, float] = TTLCache(maxsize=1024, ttl=86400)
+_dividend_yield_cache_lock = Lock()
+# Symbols whose yield could not be fetched count as 0 for a minute instead of retrying every request
+_dividend_yield_failure_cache: TTLCache[str, bool] = TTLCache(maxsize=512, ttl=60)
+# Daily returns and annualized statistics derived from the cached history, so warm requests skip the covariance
+_metrics_cache: TTLCache[
+    Tuple[Tuple[str, ...], str], Tuple[np.ndarray, np.ndarray, np.ndarray, pd.DatetimeIndex]
+] = TTLCache(maxsize=64, ttl=1800)
+_metrics_cache_lock = Lock()
+# Last SLSQP solution per symbol set and risk level; only a starting point, so it may outlive the data
+_warm_start_cache: TTLCache[Tuple[Tuple[str, ...], str], np.ndarray] = TTLCache(maxsize=64, ttl=86400)
+_warm_start_cache_lock = Lock()
+
+logger = logging.getLogger(__name__)
+
+# Downloaded history is also kept on disk, so worker processes and restarts share it
+HISTORY_CACHE_DIR = os.getenv("HISTORY_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "robo-advisor"))
+
+def _history_cache_path(key: Tuple[Tuple[str, ...], str]) -> str:
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+    return os.path.join(HISTORY_CACHE_DIR, f"history-{digest}.npz")
+
+def _read_history(key: Tuple[Tuple[str, ...], str]) -> Optional[pd.DataFrame]:
+    """Closes cached on disk for key, or None when missing, unreadable or older than HISTORY_TTL."""
+    path = _history_cache_path(key)
+    try:
+        if time.time() - os.path.getmtime(path) > HISTORY_TTL:
+            return None
+        # Plain arrays only; nothing is unpickled from the cache directory
+        with np.load(path, allow_pickle=False) as cached:
+            index = pd.DatetimeIndex(cached["index"], name="Date")
+            if cached["tz"]:
+                index = index.tz_localize("UTC").tz_convert(str(cached["tz"]))
+            return pd.DataFrame(cached["values"], index=index, columns=cached["columns"].tolist())
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _write_history(key: Tuple[Tuple[str, ...], str], closes: pd.DataFrame) -> None:
+    """Store closes on disk for key; failures only cost the next process a download."""
+    path = _history_cache_path(key)
+    index = closes.index.tz_convert("UTC").tz_localize(None) if closes.index.tz is not None else closes.index
+    try:
+        os.makedirs(HISTORY_CACHE_DIR, exist_ok=True)
+        # Write to a private file and rename it, so readers never see a partial file
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(
+                f,
+                values=closes.to_numpy(dtype=np.float64),
+                index=index.to_numpy(dtype="datetime64[ns]"),
+                tz=np.array(str(closes.index.tz) if closes.index.tz is not None else ""),
+                columns=np.array([str(column) for column in closes.columns])
+            )
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning("Could not write price history cache %s: %s", path, e)
+
+def _simulation_rows(record: np.ndarray) -> List[Dict]:
+    """{date, portfolioValue, benchmarkValue} dicts of a SIMULATION_DTYPE array, dates as YYYY-MM-DD."""
+    return [
+        {"date": date, "portfolioValue": value, "benchmarkValue": benchmark_value}
+        for date, value, benchmark_value in zip(
+            np.datetime_as_string(record["date"]).tolist(),
+            record["portfolioValue"].tolist(),
+            record["benchmarkValue"].tolist()
+        )
+    ]
 
 class PortfolioManager:
     def __init__(self):
@@ -18,28 +124,141 @@ class PortfolioManager:
         }
 
     def get_historical_data(self, symbols: List[str], period: str = "5y") -> pd.DataFrame:
-        """Fetch historical data for given symbols."""
-        data = pd.DataFrame()
-        for symbol in symbols:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period=period)["Close"]
-            data[symbol] = hist
-        return data
+        """
+        Fetch historical closing prices for given symbols.
+        All tickers are downloaded in a single request and cached per symbol set and period,
+        in memory and on disk; columns follow the order of symbols.
+        """
+        symbols = list(symbols)
+        key = (tuple(sorted(set(symbols))), period)
+        with _history_cache_lock:
+            closes = _history_cache.get(key)
+        if closes is None:
+            closes = _read_history(key)
+            if closes is None:
+                # auto_adjust matches the split/dividend adjusted closes of Ticker.history
+                closes = yf.download(list(key[0]), period=period, auto_adjust=True, threads=True, progress=False)["Close"]
+                if isinstance(closes, pd.Series):
+                    # Single-ticker downloads come back without a symbol column level
+                    closes = closes.to_frame(key[0][0])
+                # Days on which no symbol traded would otherwise replay as flat days in simulations
+                closes = closes.dropna(how="all")
+                if not closes.empty:
+                    _write_history(key, closes)
+            # A failed download comes back empty; retry it on the next call instead of serving it for an hour
+            if not closes.empty:
+                with _history_cache_lock:
+                    _history_cache[key] = closes
+        # reindex returns a new frame, so callers never modify the cached one
+        return closes.reindex(columns=symbols)
+
+    def get_current_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        Fetch the latest closing price for all symbols.
+        Recently fetched prices are served from cache; the rest are downloaded in a single request.
+        """
+        with _price_cache_lock:
+            cached = {symbol: _price_cache.get(symbol) for symbol in symbols}
+        prices = {symbol: price for symbol, price in cached.items() if price is not None}
+        missing = [symbol for symbol in symbols if symbol not in prices]
+        if not missing:
+            return prices
+
+        closes = yf.download(missing, period="1d", progress=False)["Close"]
+        if isinstance(closes, pd.Series):
+            # Single-ticker downloads come back without a symbol column level
+            closes = closes.to_frame(missing[0])
+        if closes.empty:
+            # Symbols without a price are left out, as for symbols that did not trade
+            logger.warning("Price fetch returned no data for %s", missing)
+            return prices
+        latest = closes.iloc[-1]
+        fetched = {symbol: float(latest[symbol]) for symbol in missing if pd.notna(latest.get(symbol))}
+
+        with _price_cache_lock:
+            _price_cache.update(fetched)
+        prices.update(fetched)
+        return prices
+
+    def calculate_daily_returns(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Daily returns of every price column, one row per day.
+        Same as pct_change().dropna() on the frame, without pandas' per-column dispatch.
+        """
+        return self._daily_returns_and_dates(data)[0]
+
+    def _daily_returns_and_dates(self, data: pd.DataFrame) -> Tuple[np.ndarray, pd.DatetimeIndex]:
+        """calculate_daily_returns of data along with the date of each row."""
+        prices = data.ffill().to_numpy(dtype=np.float64)  # pct_change pads gaps the same way
+        returns = prices[1:] / prices[:-1] - 1
+        complete = ~np.isnan(returns).any(axis=1)
+        return returns[complete], data.index[1:][complete]
 
     def calculate_portfolio_metrics(self, data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
-        """Calculate returns, volatility, and correlation matrix."""
-        returns = data.pct_change().dropna()
-        mean_returns = returns.mean() * 252  # Annualized returns
-        cov_matrix = returns.cov() * 252     # Annualized covariance
-        return mean_returns, cov_matrix, returns
+        """
+        Calculate returns, volatility, and correlation matrix.
+        Returns annualized mean returns, annualized covariance and daily returns in the column order of data.
+        """
+        returns = self.calculate_daily_returns(data)
+        return (*self._annualize(returns), returns)
+
+    def _annualize(self, returns: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Annualized mean returns and regularized annualized covariance of daily returns."""
+        mean_returns = returns.mean(axis=0) * TRADING_DAYS  # Annualized returns
+        if cp is not None and returns.shape[1] > GPU_COVARIANCE_MIN_ASSETS:
+            # Covariance of a large universe is memory-bound; compute it on the GPU
+            cov_matrix = cp.cov(cp.asarray(returns), rowvar=False).get() * TRADING_DAYS
+        else:
+            cov_matrix = np.atleast_2d(np.cov(returns, rowvar=False)) * TRADING_DAYS  # Annualized covariance
+        # Make the covariance exactly symmetric and lift its smallest eigenvalue off zero, so assets with
+        # (nearly) no variance or perfectly correlated ones cannot break the Cholesky and SLSQP solves
+        cov_matrix = 0.5 * (cov_matrix + cov_matrix.T)
+        min_eigenvalue = np.linalg.eigvalsh(cov_matrix)[0]
+        if min_eigenvalue < MIN_COVARIANCE_EIGENVALUE:
+            cov_matrix += (MIN_COVARIANCE_EIGENVALUE - min_eigenvalue) * np.eye(len(cov_matrix))
+        return mean_returns, cov_matrix
+
+    def get_annualized_stats(self, symbols: List[str],
+                             period: str = "5y") -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Annualized mean returns, annualized covariance and daily returns of symbols, in their order.
+        Computed once per symbol set and period and cached; callers get copies sliced by symbol index.
+        """
+        order, (mean_returns, cov_matrix, returns, _) = self._cached_metrics(symbols, period)
+        return mean_returns[order], cov_matrix[np.ix_(order, order)], returns[:, order]
+
+    def _get_returns(self, symbols: List[str], period: str) -> Tuple[np.ndarray, pd.DatetimeIndex]:
+        """
+        Daily returns of symbols, in their order, and the date of each row.
+        Shares the cache of get_annualized_stats, so simulations, stats and optimizations of the
+        same symbols and period all start from one download and one returns computation.
+        """
+        order, (_, _, returns, dates) = self._cached_metrics(symbols, period)
+        return returns[:, order], dates
+
+    def _cached_metrics(self, symbols: List[str], period: str) -> Tuple[List[int], Tuple]:
+        """
+        Column index of each symbol and the cached (mean returns, covariance, daily returns, dates)
+        of the sorted symbol set, computing them on a miss.
+        """
+        key = (tuple(sorted(set(symbols))), period)
+        with _metrics_cache_lock:
+            metrics = _metrics_cache.get(key)
+        if metrics is None:
+            returns, dates = self._daily_returns_and_dates(self.get_historical_data(list(key[0]), period))
+            metrics = (*self._annualize(returns), returns, dates)
+            with _metrics_cache_lock:
+                _metrics_cache[key] = metrics
+        position = {symbol: i for i, symbol in enumerate(key[0])}
+        return [position[symbol] for symbol in symbols], metrics
 
     def calculate_portfolio_volatility(self, weights: np.ndarray, cov_matrix: np.ndarray) -> float:
         """Calculate portfolio volatility."""
-        return np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights)))
+        return np.sqrt(weights @ cov_matrix @ weights)
 
     def calculate_portfolio_return(self, weights: np.ndarray, mean_returns: np.ndarray) -> float:
         """Calculate portfolio expected return."""
-        return np.sum(mean_returns * weights)
+        return weights @ mean_returns
 
     def calculate_sharpe_ratio(self, weights: np.ndarray, mean_returns: np.ndarray, 
                              cov_matrix: np.ndarray, risk_free_rate: float = 0.02) -> float:
@@ -52,14 +271,15 @@ class PortfolioManager:
         """Generate optimal portfolio allocation using modern portfolio theory."""
         # Get historical data
         symbols = list(self.asset_classes.values())
-        data = self.get_historical_data(symbols)
-        mean_returns, cov_matrix, _ = self.calculate_portfolio_metrics(data)
+        mean_returns, cov_matrix, _ = self.get_annualized_stats(symbols)
 
-        # Define optimization constraints
+        # Define optimization constraints; both are linear, so their Jacobians are constant
         n_assets = len(symbols)
+        ones = np.ones(n_assets)
+        identity = np.eye(n_assets)
         constraints = (
-            {'type': 'eq', 'fun': lambda x: np.sum(x) - 1},  # weights sum to 1
-            {'type': 'ineq', 'fun': lambda x: x}  # weights >= 0
+            {'type': 'eq', 'fun': lambda x: np.sum(x) - 1, 'jac': lambda x: ones},  # weights sum to 1
+            {'type': 'ineq', 'fun': lambda x: x, 'jac': lambda x: identity}  # weights >= 0
         )
 
         # Define bounds for weights (0 to 1)
@@ -85,23 +305,47 @@ class PortfolioManager:
             params["alternatives"] * 0.5   # GSG
         ])
 
-        # Optimize for maximum Sharpe ratio
-        result = minimize(
-            lambda w: -self.calculate_sharpe_ratio(w, mean_returns, cov_matrix),
-            x0=initial_weights,
-            method='SLSQP',
-            bounds=bounds,
-            constraints=constraints
-        )
+        # Bound once as contiguous float64 arrays, so every SLSQP callback runs the compiled
+        # kernels on the same layout. The covariance is symmetric, so its transpose is the
+        # same matrix laid out column-major as LAPACK expects, without copying it
+        mu = np.ascontiguousarray(mean_returns, dtype=np.float64)
+        cov = np.ascontiguousarray(cov_matrix, dtype=np.float64)
+        sigma = np.asfortranarray(cov.T)
+
+        # The tangency portfolio has the highest Sharpe ratio of all fully invested
+        # portfolios when its return beats the risk-free rate; if it also holds no
+        # short positions it solves the long-only problem as well
+        weights = tangency_weights(mu, sigma, 0.02)
+        if not (np.all(weights >= 0) and weights @ mu > 0.02):
+            # Start from the previous solution for this risk level when there is one; after a data
+            # refresh it is much closer to the optimum than the heuristic weights
+            key = (tuple(symbols), risk_level)
+            with _warm_start_cache_lock:
+                x0 = _warm_start_cache.get(key, initial_weights)
+
+            # Optimize for maximum Sharpe ratio with the analytic gradient instead of finite differences
+            result = minimize(
+                negative_sharpe_ratio,
+                x0=x0,
+                args=(mu, cov, 0.02),
+                jac=True,
+                method='SLSQP',
+                bounds=bounds,
+                constraints=constraints
+            )
+            weights = result.x
+            if result.success:
+                with _warm_start_cache_lock:
+                    _warm_start_cache[key] = weights
 
         # Convert optimized weights to dictionary
-        allocation = dict(zip(symbols, result.x))
+        allocation = dict(zip(symbols, weights))
 
         # Add optimization metrics
         allocation['metrics'] = {
-            'sharpe_ratio': -result.fun,
-            'expected_return': self.calculate_portfolio_return(result.x, mean_returns),
-            'volatility': self.calculate_portfolio_volatility(result.x, cov_matrix)
+            'sharpe_ratio': self.calculate_sharpe_ratio(weights, mu, sigma),
+            'expected_return': self.calculate_portfolio_return(weights, mu),
+            'volatility': self.calculate_portfolio_volatility(weights, sigma)
         }
 
         return allocation
@@ -109,8 +353,7 @@ class PortfolioManager:
     def calculate_efficient_frontier(self, n_points: int = 100) -> List[Dict]:
         """Calculate the efficient frontier for the portfolio."""
         symbols = list(self.asset_classes.values())
-        data = self.get_historical_data(symbols)
-        mean_returns, cov_matrix, _ = self.calculate_portfolio_metrics(data)
+        mean_returns, cov_matrix, _ = self.get_annualized_stats(symbols)
         n_assets = len(symbols)
 
         # Generate target returns
@@ -119,36 +362,57 @@ class PortfolioManager:
         target_returns = np.linspace(min_return, max_return, n_points)
 
         efficient_portfolios = []
-        constraints = (
-            {'type': 'eq', 'fun': lambda x: np.sum(x) - 1},
-            {'type': 'eq', 'fun': lambda x: self.calculate_portfolio_return(x, mean_returns) - target_returns[0]},
-            {'type': 'ineq', 'fun': lambda x: x}
-        )
         bounds = tuple((0, 1) for _ in range(n_assets))
+        ones = np.ones(n_assets)
+        identity = np.eye(n_assets)
 
-        for target_return in target_returns:
-            constraints = (
-                {'type': 'eq', 'fun': lambda x: np.sum(x) - 1},
-                {'type': 'eq', 'fun': lambda x: self.calculate_portfolio_return(x, mean_returns) - target_return},
-                {'type': 'ineq', 'fun': lambda x: x}
-            )
+        # Bound once as contiguous float64 arrays and shared by every subproblem below
+        mu = np.ascontiguousarray(mean_returns, dtype=np.float64)
+        cov = np.ascontiguousarray(cov_matrix, dtype=np.float64)
+        sigma = np.asfortranarray(cov.T)
 
-            result = minimize(
-                lambda w: self.calculate_portfolio_volatility(w, cov_matrix),
-                x0=np.array([1/n_assets] * n_assets),
-                method='SLSQP',
-                bounds=bounds,
-                constraints=constraints
-            )
+        # Closed-form frontier points for all target returns at once, one row per target. A point
+        # is also the long-only optimum whenever it holds no short positions
+        f, g = frontier_basis(mu, sigma)
+        closed_form_weights = f + np.outer(target_returns, g)
+        closed_form_volatilities = np.sqrt(np.einsum('ij,jk,ik->i', closed_form_weights, cov, closed_form_weights))
+        long_only = np.all(closed_form_weights >= 0, axis=1)
 
-            if result.success:
-                portfolio = {
-                    'weights': dict(zip(symbols, result.x)),
-                    'expected_return': target_return,
-                    'volatility': result.fun,
-                    'sharpe_ratio': (target_return - 0.02) / result.fun  # Assuming 2% risk-free rate
-                }
-                efficient_portfolios.append(portfolio)
+        # Adjacent targets have nearly the same weights, so each solve starts from the previous point
+        previous_weights = np.full(n_assets, 1 / n_assets)
+        for k, target_return in enumerate(target_returns):
+            if long_only[k]:
+                weights, volatility = closed_form_weights[k], closed_form_volatilities[k]
+            else:
+                # All constraints are linear, so their Jacobians are constant
+                constraints = (
+                    {'type': 'eq', 'fun': lambda x: np.sum(x) - 1, 'jac': lambda x: ones},
+                    {'type': 'eq', 'fun': lambda x: x @ mu - target_return, 'jac': lambda x: mu},
+                    {'type': 'ineq', 'fun': lambda x: x, 'jac': lambda x: identity}
+                )
+
+                result = minimize(
+                    portfolio_volatility,
+                    x0=previous_weights,
+                    args=(cov,),
+                    jac=True,
+                    method='SLSQP',
+                    bounds=bounds,
+                    constraints=constraints
+                )
+
+                if not result.success:
+                    continue
+                weights, volatility = result.x, result.fun
+
+            previous_weights = weights
+            portfolio = {
+                'weights': dict(zip(symbols, weights)),
+                'expected_return': target_return,
+                'volatility': volatility,
+                'sharpe_ratio': (target_return - 0.02) / volatility  # Assuming 2% risk-free rate
+            }
+            efficient_portfolios.append(portfolio)
 
         return efficient_portfolios
 
@@ -159,14 +423,13 @@ class PortfolioManager:
         Determine trades needed to rebalance portfolio.
         Returns dictionary of trades needed (positive for buy, negative for sell).
         """
-        trades = {}
-        for symbol in target_allocation:
-            current = current_allocation.get(symbol, 0)
-            target = target_allocation[symbol]
-            diff = target - current
-            if abs(diff) > threshold:
-                trades[symbol] = diff
-        return trades
+        # Compare the weights as dense arrays in target order; held symbols without a target are ignored
+        symbols = list(target_allocation)
+        target = np.fromiter(target_allocation.values(), dtype=np.float64, count=len(symbols))
+        current = np.fromiter((current_allocation.get(symbol, 0) for symbol in symbols),
+                              dtype=np.float64, count=len(symbols))
+        indices, diffs = rebalance_trades(target, current, float(threshold))
+        return {symbols[i]: diff for i, diff in zip(indices.tolist(), diffs.tolist())}
 
     def calculate_tax_loss_harvest(self, transactions: List[Dict], 
                                  current_prices: Dict[str, float]) -> List[Dict]:
@@ -174,53 +437,91 @@ class PortfolioManager:
         Identify tax loss harvesting opportunities.
         Returns list of recommended trades.
         """
-        harvest_opportunities = []
-        for transaction in transactions:
-            symbol = transaction["symbol"]
-            purchase_price = transaction["price"]
-            current_price = current_prices.get(symbol)
-            
-            if current_price and current_price < purchase_price:
-                loss = (current_price - purchase_price) * transaction["shares"]
-                if abs(loss) > 1000:  # Minimum loss threshold
-                    harvest_opportunities.append({
-                        "symbol": symbol,
-                        "shares": transaction["shares"],
-                        "potential_loss": loss
-                    })
-        return harvest_opportunities
+        if not transactions:
+            return []
+
+        # Scan the lots as flat arrays; a missing price becomes NaN and never matches
+        count = len(transactions)
+        shares = np.fromiter((t["shares"] for t in transactions), dtype=np.float64, count=count)
+        purchase_prices = np.fromiter((t["price"] for t in transactions), dtype=np.float64, count=count)
+        prices = np.fromiter(
+            (current_prices.get(t["symbol"]) or np.nan for t in transactions),
+            dtype=np.float64,
+            count=count
+        )
+
+        indices, losses = harvest_losses(shares, purchase_prices, prices, 1000.0)  # Minimum loss threshold
+        return [
+            {
+                "symbol": transactions[i]["symbol"],
+                "shares": transactions[i]["shares"],
+                "potential_loss": loss
+            }
+            for i, loss in zip(indices.tolist(), losses.tolist())
+        ]
 
     def get_portfolio_stats(self, allocation: Dict[str, float], 
                           investment_amount: float) -> Dict:
         """Calculate portfolio statistics."""
         symbols = list(allocation.keys())
-        data = self.get_historical_data(symbols, period="1y")
-        returns = data.pct_change().dropna()
+        _, _, returns = self.get_annualized_stats(symbols, period="1y")
         
-        portfolio_returns = (returns * pd.Series(allocation)).sum(axis=1)
+        weights = np.fromiter(allocation.values(), dtype=np.float64, count=len(allocation))
+        portfolio_returns = returns @ weights
+        annual_return = portfolio_returns.mean() * TRADING_DAYS
+        annual_volatility = portfolio_returns.std(ddof=1) * SQRT_TRADING_DAYS
         stats = {
-            "expected_annual_return": portfolio_returns.mean() * 252,
-            "annual_volatility": portfolio_returns.std() * np.sqrt(252),
-            "sharpe_ratio": (portfolio_returns.mean() * 252) / (portfolio_returns.std() * np.sqrt(252)),
-            "max_drawdown": (portfolio_returns + 1).cumprod().div((portfolio_returns + 1).cumprod().cummax()) - 1,
+            "expected_annual_return": annual_return,
+            "annual_volatility": annual_volatility,
+            "sharpe_ratio": annual_return / annual_volatility,
+            "max_drawdown": max_drawdown_of_returns(portfolio_returns),
             "investment_amount": investment_amount,
             "estimated_annual_income": self._calculate_estimated_income(allocation, investment_amount)
         }
         return stats
 
+    def get_dividend_yields(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        Trailing twelve-month dividend yields as fractions of the last close (0.015 for 1.5%), cached for a day.
+        Symbols missing from the cache are fetched together in one threaded download; symbols that
+        fail to download count as 0 and are not retried for a minute.
+        """
+        with _dividend_yield_cache_lock:
+            yields = {symbol: _dividend_yield_cache[symbol]
+                      for symbol in symbols if symbol in _dividend_yield_cache}
+            missing = [symbol for symbol in symbols
+                       if symbol not in yields and symbol not in _dividend_yield_failure_cache]
+        if missing:
+            try:
+                data = yf.download(missing, period="1y", actions=True, auto_adjust=False,
+                                   threads=True, progress=False)
+                dividends, closes = data["Dividends"], data["Close"]
+                if isinstance(closes, pd.Series):
+                    # Single-ticker downloads come back without a symbol column level
+                    dividends, closes = dividends.to_frame(missing[0]), closes.to_frame(missing[0])
+                dividends = dividends.reindex(columns=missing).sum()
+                last_close = closes.reindex(columns=missing).ffill().iloc[-1]
+                fetched = (dividends / last_close)[last_close.notna()].to_dict()
+            # Network errors surface as OSError, an empty download as a missing column or row
+            except (OSError, ValueError, LookupError, YFException) as e:
+                logger.warning("Dividend yield fetch failed for %s: %s", missing, e)
+                fetched = {}
+            with _dividend_yield_cache_lock:
+                _dividend_yield_cache.update(fetched)
+                for symbol in missing:
+                    if symbol not in fetched:
+                        _dividend_yield_failure_cache[symbol] = True
+            yields.update(fetched)
+        return {symbol: yields.get(symbol, 0.0) for symbol in symbols}
+
     def _calculate_estimated_income(self, allocation: Dict[str, float], 
                                  investment_amount: float) -> float:
         """Calculate estimated annual income from dividends."""
-        annual_income = 0
-        for symbol, weight in allocation.items():
-            ticker = yf.Ticker(symbol)
-            try:
-                dividend_yield = ticker.info.get('dividendYield', 0)
-                # Convert to ten thousand dollars
-                annual_income += (weight * investment_amount * dividend_yield) / 10000
-            except:
-                continue
-        return annual_income
+        # get_dividend_yields answers in the order of allocation, so weights and yields line up
+        yields = self.get_dividend_yields(list(allocation))
+        weights = np.fromiter(allocation.values(), dtype=np.float64, count=len(allocation))
+        # Fractional yields times dollars, converted to ten thousand dollars
+        return float(weights @ np.fromiter(yields.values(), dtype=np.float64, count=len(yields))) * investment_amount / 10000
 
     def simulate_portfolio(self, allocation: Dict[str, float], 
                          initial_investment: float,
@@ -230,39 +531,75 @@ class PortfolioManager:
         Simulate portfolio performance over a given time horizon.
         Returns list of portfolio values over time.
         """
-        symbols = list(allocation.keys())
+        return self.simulate_portfolios([allocation], initial_investment,
+                                        monthly_contribution, time_horizon)[0]
+
+    def simulate_portfolios(self, allocations: List[Dict[str, float]],
+                          initial_investment: float,
+                          monthly_contribution: float,
+                          time_horizon: int) -> List[List[Dict]]:
+        """
+        Simulate several portfolios over the same time horizon.
+        Returns one list of portfolio values over time per allocation.
+        """
+        records = self._simulate_records(allocations, initial_investment, monthly_contribution, time_horizon)
+        return [_simulation_rows(record) for record in records]
+
+    def _simulate_records(self, allocations: List[Dict[str, float]],
+                        initial_investment: float,
+                        monthly_contribution: float,
+                        time_horizon: int) -> List[np.ndarray]:
+        """
+        Simulate several portfolios over the same time horizon, one SIMULATION_DTYPE array per allocation.
+        Prices for all symbols are fetched once and every portfolio's daily returns
+        come out of a single returns @ weights product.
+        """
         # Add SPY to get benchmark data
-        symbols.append("SPY")
-        data = self.get_historical_data(symbols, period=f"{time_horizon}y")
-        returns = data.pct_change().dropna()
-        
-        # Calculate portfolio returns (excluding SPY)
-        portfolio_returns = (returns[symbols[:-1]] * pd.Series(allocation)).sum(axis=1)
+        symbols = sorted(set().union(*allocations) | {"SPY"})
+        returns, dates = self._get_returns(symbols, period=f"{time_horizon}y")
         
-        # Calculate cumulative portfolio value
-        portfolio_values = []
-        current_value = initial_investment
-        benchmark_value = initial_investment
+        # Weight matrix with one column per portfolio (excluding the SPY benchmark). Daily returns
+        # only need basis-point precision, so they are kept in float32 to halve the bytes streamed
+        # through the product and the compounding loop; values still accumulate in float64
+        column = {symbol: i for i, symbol in enumerate(symbols)}
+        weights = np.zeros((len(symbols), len(allocations)), dtype=np.float32)
+        for k, allocation in enumerate(allocations):
+            for symbol, weight in allocation.items():
+                weights[column[symbol], k] = weight
+        portfolio_returns = returns.astype(np.float32) @ weights
         
-        for date, ret in portfolio_returns.items():
-            # Add monthly contribution
-            if date.day == 1:  # First day of each month
-                current_value += monthly_contribution
-                benchmark_value += monthly_contribution
-            
-            # Apply portfolio return
-            current_value *= (1 + ret)
-            
-            # Apply benchmark return (SPY)
-            benchmark_value *= (1 + returns.loc[date, "SPY"])
-            
-            portfolio_values.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "portfolioValue": round(current_value, 2),
-                "benchmarkValue": round(benchmark_value, 2)
-            })
+        # Compound the portfolios and the SPY benchmark together, the benchmark as the last column
+        benchmark = column["SPY"]
+        values = self._simulate_values(
+            dates,
+            np.column_stack((portfolio_returns, returns[:, benchmark].astype(np.float32))),
+            initial_investment,
+            monthly_contribution
+        )
         
-        return portfolio_values
+        # Calendar dates as the exchange saw them, whatever the index time zone
+        days = dates.tz_localize(None).to_numpy().astype("datetime64[D]")
+        records = []
+        for k in range(len(allocations)):
+            record = np.empty(len(days), dtype=SIMULATION_DTYPE)
+            record["date"] = days
+            record["portfolioValue"] = values[:, k]
+            record["benchmarkValue"] = values[:, -1]
+            records.append(record)
+        return records
+
+    def _simulate_values(self, dates: pd.DatetimeIndex,
+                       returns: np.ndarray,
+                       initial_investment: float,
+                       monthly_contribution: float) -> np.ndarray:
+        """
+        Daily values of every column of returns, compounded with a contribution on the first of each month.
+        Returns the values rounded to cents, one row per date.
+        """
+        contributions = np.where(dates.day == 1, monthly_contribution, 0.0)
+        values = compound_with_contributions(np.ascontiguousarray(returns, dtype=np.float32),
+                                             contributions, float(initial_investment))
+        return np.round(values, 2)
 
     def backtest_portfolio(self, allocation: Dict[str, float],
                          initial_investment: float,
@@ -271,34 +608,8 @@ class PortfolioManager:
         Run a backtest of the portfolio over historical data.
         Returns list of portfolio values over time.
         """
-        symbols = list(allocation.keys())
-        # Add SPY to get benchmark data
-        symbols.append("SPY")
-        data = self.get_historical_data(symbols, period=f"{time_horizon}y")
-        returns = data.pct_change().dropna()
-        
-        # Calculate portfolio returns (excluding SPY)
-        portfolio_returns = (returns[symbols[:-1]] * pd.Series(allocation)).sum(axis=1)
-        
-        # Calculate cumulative portfolio value
-        portfolio_values = []
-        current_value = initial_investment
-        benchmark_value = initial_investment
-        
-        for date, ret in portfolio_returns.items():
-            # Apply portfolio return
-            current_value *= (1 + ret)
-            
-            # Apply benchmark return (SPY)
-            benchmark_value *= (1 + returns.loc[date, "SPY"])
-            
-            portfolio_values.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "portfolioValue": round(current_value, 2),
-                "benchmarkValue": round(benchmark_value, 2)
-            })
-        
-        return portfolio_values
+        # A backtest is a simulation without monthly contributions, compounded in the same vectorized kernel
+        return self.simulate_portfolio(allocation, initial_investment, 0.0, time_horizon)
 
     def analyze_scenario(self, allocation: Dict[str, float],
                         initial_investment: float,
@@ -307,19 +618,20 @@ class PortfolioManager:
         Analyze a what-if scenario for the portfolio.
         Returns performance metrics for the scenario.
         """
-        backtest_results = self.backtest_portfolio(allocation, initial_investment, time_horizon)
+        # The backtest as a structured array, so the metrics read its value column directly
+        record = self._simulate_records([allocation], initial_investment, 0.0, time_horizon)[0]
         
         # Calculate performance metrics
-        portfolio_values = [p["portfolioValue"] for p in backtest_results]
+        portfolio_values = np.ascontiguousarray(record["portfolioValue"])
         returns = np.diff(portfolio_values) / portfolio_values[:-1]
         
         metrics = {
-            "total_return": (portfolio_values[-1] - initial_investment) / initial_investment,
-            "annualized_return": (1 + returns.mean()) ** 252 - 1,
-            "volatility": returns.std() * np.sqrt(252),
-            "sharpe_ratio": (returns.mean() * 252) / (returns.std() * np.sqrt(252)),
-            "max_drawdown": (np.maximum.accumulate(portfolio_values) - portfolio_values) / np.maximum.accumulate(portfolio_values),
-            "backtest_results": backtest_results
+            "total_return": float(portfolio_values[-1] - initial_investment) / initial_investment,
+            "annualized_return": (1 + returns.mean()) ** TRADING_DAYS - 1,
+            "volatility": returns.std() * SQRT_TRADING_DAYS,
+            "sharpe_ratio": (returns.mean() * TRADING_DAYS) / (returns.std() * SQRT_TRADING_DAYS),
+            "max_drawdown": max_drawdown(portfolio_values),
+            "backtest_results": _simulation_rows(record)
         }
         
         return metrics 
\ No newline at end of file
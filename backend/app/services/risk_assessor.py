@@ -1,6 +1,68 @@
-from typing import Dict, List
+from bisect import bisect_left, bisect_right
+from types import MappingProxyType
+from typing import Dict, List, Mapping
 from ..models.models import RiskLevel
 
+# Risk score cut-offs; a score below RISK_SCORE_THRESHOLDS[i] maps to RISK_LEVELS[i]
+RISK_SCORE_THRESHOLDS = (30, 45, 60, 75)
+RISK_LEVELS = (
+    RiskLevel.CONSERVATIVE,
+    RiskLevel.MODERATE_CONSERVATIVE,
+    RiskLevel.MODERATE,
+    RiskLevel.MODERATE_AGGRESSIVE,
+    RiskLevel.AGGRESSIVE
+)
+
+# Questionnaire answer buckets. Ages below AGE_THRESHOLDS[i] score AGE_SCORES[i]; for the other
+# questions, answers at or below THRESHOLDS[i] score SCORES[i] and anything higher the last score
+AGE_THRESHOLDS = (30, 40, 50, 60)
+AGE_SCORES = (100, 80, 60, 40, 20)  # younger = higher score
+INCOME_THRESHOLDS = (50000, 100000, 200000)
+INCOME_SCORES = (40, 60, 80, 100)
+SAVINGS_THRESHOLDS = (25000, 100000, 500000)
+SAVINGS_SCORES = (40, 60, 80, 100)
+HORIZON_THRESHOLDS = (3, 5, 10)
+HORIZON_SCORES = (25, 50, 75, 100)
+
+# Read-only; the inner dicts stay plain so they serialize as-is
+RISK_PROFILE_SUMMARIES: Mapping[RiskLevel, Dict[str, str]] = MappingProxyType({
+    RiskLevel.CONSERVATIVE: {
+        "description": "Focus on preserving capital with modest growth potential",
+        "suitable_for": "Investors close to retirement or with low risk tolerance",
+        "expected_return": "4-6% annually",
+        "volatility": "Low",
+        "investment_horizon": "1-3 years"
+    },
+    RiskLevel.MODERATE_CONSERVATIVE: {
+        "description": "Balanced approach with emphasis on stability",
+        "suitable_for": "Investors seeking steady growth with limited volatility",
+        "expected_return": "5-7% annually",
+        "volatility": "Low to Medium",
+        "investment_horizon": "3-5 years"
+    },
+    RiskLevel.MODERATE: {
+        "description": "Balance between growth and stability",
+        "suitable_for": "Investors comfortable with market fluctuations",
+        "expected_return": "6-8% annually",
+        "volatility": "Medium",
+        "investment_horizon": "5-10 years"
+    },
+    RiskLevel.MODERATE_AGGRESSIVE: {
+        "description": "Growth-oriented with higher risk tolerance",
+        "suitable_for": "Long-term investors seeking capital appreciation",
+        "expected_return": "7-9% annually",
+        "volatility": "Medium to High",
+        "investment_horizon": "10-15 years"
+    },
+    RiskLevel.AGGRESSIVE: {
+        "description": "Maximum growth potential with high risk tolerance",
+        "suitable_for": "Young investors with long time horizons",
+        "expected_return": "8-10%+ annually",
+        "volatility": "High",
+        "investment_horizon": "15+ years"
+    }
+})
+
 class RiskAssessor:
     def __init__(self):
         self.question_weights = {
@@ -18,72 +80,16 @@ class RiskAssessor:
         Calculate risk score based on questionnaire answers.
         Returns a score between 0-100.
         """
-        score = 0
-        
-        # Age score (younger = higher score)
-        age = answers.get("age", 0)
-        if age < 30:
-            age_score = 100
-        elif age < 40:
-            age_score = 80
-        elif age < 50:
-            age_score = 60
-        elif age < 60:
-            age_score = 40
-        else:
-            age_score = 20
-        score += age_score * self.question_weights["age"]
-
-        # Income score
-        annual_income = answers.get("income", 0)
-        if annual_income > 200000:
-            income_score = 100
-        elif annual_income > 100000:
-            income_score = 80
-        elif annual_income > 50000:
-            income_score = 60
-        else:
-            income_score = 40
-        score += income_score * self.question_weights["income"]
-
-        # Savings score
-        savings = answers.get("savings", 0)
-        if savings > 500000:
-            savings_score = 100
-        elif savings > 100000:
-            savings_score = 80
-        elif savings > 25000:
-            savings_score = 60
-        else:
-            savings_score = 40
-        score += savings_score * self.question_weights["savings"]
-
-        # Investment horizon score
-        horizon = answers.get("investment_horizon", 0)
-        if horizon > 10:
-            horizon_score = 100
-        elif horizon > 5:
-            horizon_score = 75
-        elif horizon > 3:
-            horizon_score = 50
-        else:
-            horizon_score = 25
-        score += horizon_score * self.question_weights["investment_horizon"]
-
-        # Risk attitude score (1-5, 5 being most aggressive)
-        risk_attitude = answers.get("risk_attitude", 3)
-        risk_attitude_score = risk_attitude * 20
-        score += risk_attitude_score * self.question_weights["risk_attitude"]
-
-        # Investment knowledge score (1-5, 5 being expert)
-        knowledge = answers.get("investment_knowledge", 3)
-        knowledge_score = knowledge * 20
-        score += knowledge_score * self.question_weights["investment_knowledge"]
-
-        # Loss tolerance score (1-5, 5 being highest tolerance)
-        loss_tolerance = answers.get("loss_tolerance", 3)
-        loss_tolerance_score = loss_tolerance * 20
-        score += loss_tolerance_score * self.question_weights["loss_tolerance"]
+        weights = self.question_weights
+        # Bucketed answers are looked up by bisection; the 1-5 scale answers score 20 per step
+        score = AGE_SCORES[bisect_right(AGE_THRESHOLDS, answers.get("age", 0))] * weights["age"]
+        score += INCOME_SCORES[bisect_left(INCOME_THRESHOLDS, answers.get("income", 0))] * weights["income"]
+        score += SAVINGS_SCORES[bisect_left(SAVINGS_THRESHOLDS, answers.get("savings", 0))] * weights["savings"]
+        score += (HORIZON_SCORES[bisect_left(HORIZON_THRESHOLDS, answers.get("investment_horizon", 0))]
+                  * weights["investment_horizon"])
+        score += answers.get("risk_attitude", 3) * 20 * weights["risk_attitude"]
+        score += answers.get("investment_knowledge", 3) * 20 * weights["investment_knowledge"]
+        score += answers.get("loss_tolerance", 3) * 20 * weights["loss_tolerance"]
 
         return round(score)
 
@@ -91,16 +97,7 @@ class RiskAssessor:
         """
         Convert numerical risk score to risk level category.
         """
-        if risk_score < 30:
-            return RiskLevel.CONSERVATIVE
-        elif risk_score < 45:
-            return RiskLevel.MODERATE_CONSERVATIVE
-        elif risk_score < 60:
-            return RiskLevel.MODERATE
-        elif risk_score < 75:
-            return RiskLevel.MODERATE_AGGRESSIVE
-        else:
-            return RiskLevel.AGGRESSIVE
+        return RISK_LEVELS[bisect_right(RISK_SCORE_THRESHOLDS, risk_score)]
 
     def get_investment_goals(self, answers: Dict) -> List[str]:
         """
@@ -125,41 +122,4 @@ class RiskAssessor:
         """
         Get detailed description of risk profile.
         """
-        summaries = {
-            RiskLevel.CONSERVATIVE: {
-                "description": "Focus on preserving capital with modest growth potential",
-                "suitable_for": "Investors close to retirement or with low risk tolerance",
-                "expected_return": "4-6% annually",
-                "volatility": "Low",
-                "investment_horizon": "1-3 years"
-            },
-            RiskLevel.MODERATE_CONSERVATIVE: {
-                "description": "Balanced approach with emphasis on stability",
-                "suitable_for": "Investors seeking steady growth with limited volatility",
-                "expected_return": "5-7% annually",
-                "volatility": "Low to Medium",
-                "investment_horizon": "3-5 years"
-            },
-            RiskLevel.MODERATE: {
-                "description": "Balance between growth and stability",
-                "suitable_for": "Investors comfortable with market fluctuations",
-                "expected_return": "6-8% annually",
-                "volatility": "Medium",
-                "investment_horizon": "5-10 years"
-            },
-            RiskLevel.MODERATE_AGGRESSIVE: {
-                "description": "Growth-oriented with higher risk tolerance",
-                "suitable_for": "Long-term investors seeking capital appreciation",
-                "expected_return": "7-9% annually",
-                "volatility": "Medium to High",
-                "investment_horizon": "10-15 years"
-            },
-            RiskLevel.AGGRESSIVE: {
-                "description": "Maximum growth potential with high risk tolerance",
-                "suitable_for": "Young investors with long time horizons",
-                "expected_return": "8-10%+ annually",
-                "volatility": "High",
-                "investment_horizon": "15+ years"
-            }
-        }
-        return summaries[risk_level] 
\ No newline at end of file
+        return RISK_PROFILE_SUMMARIES[risk_level]
\ No newline at end of file
@@ -0,0 +1,148 @@
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to plain NumPy execution
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+def frontier_basis(mu: np.ndarray, sigma: np.ndarray):
+    """
+    Vectors f and g of the closed-form efficient frontier w = f + rho * g, the minimum-variance
+    weights for target return rho of a fully invested portfolio with short sales allowed.
+    They depend only on mu and sigma, so one call serves every point of the frontier.
+    Sigma is symmetric positive definite, so it is Cholesky-factored once rather than inverted.
+    """
+    n = mu.shape[0]
+    ones = np.ones(n)
+    factor = cho_factor(sigma, lower=True)
+    q_ones, q_mu = cho_solve(factor, np.column_stack((ones, mu))).T
+
+    a11 = ones @ q_ones
+    a12 = ones @ q_mu
+    a22 = mu @ q_mu
+    d = a11 * a22 - a12 * a12
+
+    f = (a22 * q_ones - a12 * q_mu) / d
+    g = (a11 * q_mu - a12 * q_ones) / d
+    return f, g
+
+
+@njit(cache=True, fastmath=True)
+def tangency_weights(mu: np.ndarray, sigma: np.ndarray, risk_free_rate: float) -> np.ndarray:
+    """
+    Maximum Sharpe ratio (tangency) weights for a fully invested portfolio.
+    Solves the linear system sigma @ z = mu - rf instead of inverting sigma.
+    """
+    z = np.linalg.solve(sigma, mu - risk_free_rate)
+    return z / z.sum()
+
+
+@njit(cache=True)
+def negative_sharpe_ratio(weights: np.ndarray, mu: np.ndarray, sigma: np.ndarray,
+                          risk_free_rate: float):
+    """
+    Negative Sharpe ratio of weights and its gradient, for minimize(..., jac=True).
+    d/dw (r - rf) / s = mu / s - (r - rf) * (sigma @ w) / s^3 with r = w @ mu and s^2 = w @ sigma @ w.
+    """
+    sigma_w = sigma @ weights
+    variance = weights @ sigma_w
+    volatility = np.sqrt(variance)
+    excess_return = weights @ mu - risk_free_rate
+    gradient = excess_return * sigma_w / (volatility * variance) - mu / volatility
+    return -excess_return / volatility, gradient
+
+
+@njit(cache=True)
+def portfolio_volatility(weights: np.ndarray, sigma: np.ndarray):
+    """
+    Volatility sqrt(w @ sigma @ w) of weights and its gradient (sigma @ w) / volatility,
+    for minimize(..., jac=True).
+    """
+    sigma_w = sigma @ weights
+    volatility = np.sqrt(weights @ sigma_w)
+    return volatility, sigma_w / volatility
+
+
+# Compiled eagerly at import, like rebalance_trades below, so the first tax-loss request does not pay for the JIT
+@njit("Tuple((i8[:], f8[:]))(f8[:], f8[:], f8[:], f8)", cache=True)
+def harvest_losses(shares: np.ndarray, purchase_prices: np.ndarray,
+                   current_prices: np.ndarray, threshold: float):
+    """
+    Lots trading below their purchase price with a loss larger than the threshold.
+    Returns the matching lot indices and their (negative) losses.
+    """
+    losses = (current_prices - purchase_prices) * shares
+    mask = (current_prices < purchase_prices) & (np.abs(losses) > threshold)
+    indices = np.flatnonzero(mask)
+    return indices, losses[indices]
+
+
+# Compiled eagerly at import so the first rebalance request does not pay for the JIT
+@njit("Tuple((i8[:], f8[:]))(f8[:], f8[:], f8)", cache=True)
+def rebalance_trades(target_weights: np.ndarray, current_weights: np.ndarray, threshold: float):
+    """
+    Positions whose weight drifted from the target by more than the threshold.
+    Returns the matching indices and the weight changes (positive to buy, negative to sell).
+    """
+    diff = target_weights - current_weights
+    indices = np.flatnonzero(np.abs(diff) > threshold)
+    return indices, diff[indices]
+
+
+# nogil lets simulations called from a thread pool compound in parallel
+@njit(cache=True, nogil=True)
+def compound_with_contributions(returns: np.ndarray, contributions: np.ndarray,
+                                initial_value: float) -> np.ndarray:
+    """
+    Daily values of every column of returns, adding contributions[t] before applying day t's return.
+    One sequential pass of v[t] = (v[t-1] + c[t]) * (1 + r[t]), updated in place without per-day temporaries.
+    The returns may be float32; the running values are always accumulated in float64.
+    """
+    n_days, n_series = returns.shape
+    values = np.empty((n_days, n_series))
+    current = np.full(n_series, initial_value)
+    for t in range(n_days):
+        contribution = contributions[t]
+        for k in range(n_series):
+            current[k] = (current[k] + contribution) * (1.0 + returns[t, k])
+            values[t, k] = current[k]
+    return values
+
+
+@njit(cache=True)
+def max_drawdown(values: np.ndarray) -> float:
+    """
+    Largest peak-to-trough decline of a value series, as a positive fraction of the peak.
+    Tracks the running peak in a single pass instead of materializing it.
+    """
+    peak = values[0]
+    worst = 0.0
+    for value in values:
+        if value > peak:
+            peak = value
+        elif 1.0 - value / peak > worst:
+            worst = 1.0 - value / peak
+    return worst
+
+
+@njit(cache=True)
+def max_drawdown_of_returns(returns: np.ndarray) -> float:
+    """
+    max_drawdown of the growth of 1 compounded from daily returns, i.e. of cumprod(1 + returns).
+    Compounds on the fly, so neither the growth path nor 1 + returns is materialized.
+    """
+    value = 1.0 + returns[0]
+    peak = value
+    worst = 0.0
+    for t in range(1, returns.shape[0]):
+        value *= 1.0 + returns[t]
+        if value > peak:
+            peak = value
+        elif 1.0 - value / peak > worst:
+            worst = 1.0 - value / peak
+    return worst
\ No newline at end of file
@@ -6,4 +6,17 @@ import uvicorn
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="127.0.0.1", port=8000, reload=True) 
\ No newline at end of file
+    # Auto-reload is for local development only; otherwise serve with one worker per core
+    if os.getenv("ENV") == "dev":
+        uvicorn.run("app.main:app", host="127.0.0.1", port=8000, reload=True)
+    else:
+        # uvloop has no Windows build; httptools comes with uvicorn[standard] everywhere
+        uvicorn.run(
+            "app.main:app",
+            host="127.0.0.1",
+            port=8000,
+            workers=os.cpu_count(),
+            loop="asyncio" if sys.platform == "win32" else "uvloop",
+            http="httptools",
+            access_log=False
+        )
\ No newline at end of file
@@ -0,0 +1,18 @@
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import engine
+from app.models.portfolio import add_portfolio_indexes as add_indexes
+
+def add_portfolio_indexes():
+    """Create the portfolio_id indexes on databases whose tables predate them."""
+    print("Creating portfolio indexes...")
+    with engine.begin() as connection:
+        add_indexes(connection)
+    print("Portfolio indexes created successfully!")
+
+if __name__ == "__main__":
+    add_portfolio_indexes()
\ No newline at end of file
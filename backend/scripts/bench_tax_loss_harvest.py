@@ -0,0 +1,42 @@
+import sys
+import os
+import timeit
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from app.services.portfolio_manager import PortfolioManager
+
+def pandas_tax_loss_harvest(transactions, current_prices):
+    """The DataFrame formulation of calculate_tax_loss_harvest: map prices, compute losses, filter."""
+    df = pd.DataFrame(transactions)
+    df["current"] = df["symbol"].map(current_prices)
+    df["potential_loss"] = (df["current"] - df["price"]) * df["shares"]
+    mask = (df["current"] < df["price"]) & (df["potential_loss"].abs() > 1000)
+    return df.loc[mask, ["symbol", "shares", "potential_loss"]].to_dict("records")
+
+def bench_tax_loss_harvest(n_lots=10000, n_symbols=50, number=20):
+    """Time the lot scan of calculate_tax_loss_harvest against the DataFrame formulation."""
+    rng = np.random.default_rng(0)
+    symbols = [f"SYM{i}" for i in range(n_symbols)]
+    transactions = [
+        {"symbol": symbols[i], "price": float(price), "shares": float(shares)}
+        for i, price, shares in zip(
+            rng.integers(n_symbols, size=n_lots).tolist(),
+            rng.uniform(50, 150, n_lots),
+            rng.integers(1, 500, n_lots)
+        )
+    ]
+    current_prices = {symbol: float(price) for symbol, price in zip(symbols, rng.uniform(50, 150, n_symbols))}
+    manager = PortfolioManager()
+
+    assert manager.calculate_tax_loss_harvest(transactions, current_prices) == \
+        pandas_tax_loss_harvest(transactions, current_prices)
+    for name, func in (("kernel", manager.calculate_tax_loss_harvest), ("pandas", pandas_tax_loss_harvest)):
+        seconds = timeit.timeit(lambda: func(transactions, current_prices), number=number) / number
+        print(f"{name}: {seconds * 1000:.2f} ms for {n_lots} lots")
+
+if __name__ == "__main__":
+    bench_tax_loss_harvest()
\ No newline at end of file
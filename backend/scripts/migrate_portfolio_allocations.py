@@ -0,0 +1,18 @@
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import engine
+from app.models.models import migrate_portfolio_allocations as migrate
+
+def migrate_portfolio_allocations():
+    """Copy the JSON allocation of portfolios without allocation rows into portfolio_allocations."""
+    print("Migrating portfolio allocations...")
+    with engine.begin() as connection:
+        rows = migrate(connection)
+    print(f"Migrated {len({row['portfolio_id'] for row in rows})} portfolios ({len(rows)} allocation rows)")
+
+if __name__ == "__main__":
+    migrate_portfolio_allocations()
\ No newline at end of file
@@ -1,18 +1,34 @@
+import os
 from setuptools import setup, find_packages
 
+# Opt-in Cython build of the request handlers: USE_CYTHON=1 python setup.py build_ext --inplace
+# places app/main.*.so next to main.py, and the interpreter imports it in preference to the source.
+# annotation_typing stays off so annotated handler arguments keep Python semantics for FastAPI.
+ext_modules = []
+if os.getenv("USE_CYTHON") == "1":
+    from Cython.Build import cythonize
+    ext_modules = cythonize(
+        ["app/main.py"],
+        compiler_directives={"language_level": 3, "binding": True, "annotation_typing": False}
+    )
+
 setup(
     name="robo-advisor",
     version="0.1",
     packages=find_packages(),
+    ext_modules=ext_modules,
     install_requires=[
-        "fastapi",
-        "uvicorn",
+        "fastapi>=0.100",
+        "uvicorn[standard]",
         "sqlalchemy",
-        "pydantic",
+        "aiosqlite",
+        "pydantic>=2",
         "python-dotenv",
         "yfinance",
         "numpy",
         "pandas",
         "scipy",
+        "cachetools",
+        "orjson",
     ],
 ) 
\ No newline at end of file
@@ -1,13 +1,36 @@
+import os
+import tempfile
+import zlib
+import numpy as np
+import pandas as pd
 import pytest
 from fastapi.testclient import TestClient
-from app.main import app
 
-@pytest.fixture
+# The app creates its engines on import and migrates the database in its lifespan,
+# so point it at a scratch file before importing it instead of the repository's database
+os.environ["DATABASE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="robo-advisor-tests-"), "robo_advisor.db")
+
+from app.main import app  # noqa: E402
+from app.services import portfolio_manager  # noqa: E402
+from app.services.portfolio_manager import PortfolioManager  # noqa: E402
+
+# Annual drift and volatility of the synthetic closes, roughly those of each asset class
+PRICE_PARAMS = {
+    "VTI": (0.10, 0.18),
+    "VXUS": (0.06, 0.17),
+    "BND": (0.03, 0.05),
+    "BNDX": (0.025, 0.045),
+    "VNQ": (0.07, 0.22),
+    "GSG": (0.02, 0.25)
+}
+
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the FastAPI application."""
-    return TestClient(app)
+    """Create a test client for the FastAPI application, running its lifespan once per session."""
+    with TestClient(app) as client:
+        yield client
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_portfolio_data():
     """Sample portfolio data for testing."""
     return {
@@ -20,7 +43,7 @@ def test_portfolio_data():
         }
     }
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_risk_assessment_data():
     """Sample risk assessment data for testing."""
     return {
@@ -29,4 +52,19 @@ def test_risk_assessment_data():
         "investment_horizon": 20,
         "risk_tolerance": 7,
         "investment_goals": ["growth", "income"]
-    } 
\ No newline at end of file
+    } 
+
+@pytest.fixture
+def historical_prices(monkeypatch):
+    """Serve deterministic synthetic daily closes instead of downloading them from Yahoo."""
+    def get_historical_data(self, symbols, period="5y"):
+        days = 252 * int(period[:-1])
+        closes = {}
+        for symbol in symbols:
+            drift, volatility = PRICE_PARAMS.get(symbol, (0.08, 0.20))
+            rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+            returns = rng.normal(drift / 252, volatility / np.sqrt(252), days)
+            closes[symbol] = 100 * np.cumprod(np.r_[1.0, 1 + returns])
+        return pd.DataFrame(closes, index=pd.bdate_range(end="2024-12-31", periods=days + 1))
+    monkeypatch.setattr(PortfolioManager, "get_historical_data", get_historical_data)
+    monkeypatch.setattr(portfolio_manager, "_metrics_cache", {})
\ No newline at end of file
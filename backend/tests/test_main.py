@@ -1,4 +1,12 @@
+import json
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from app import main, models
+from app.core.database import Base, get_db
+from app.models.portfolio import migrate_simulation_results
+from app.services.portfolio_manager import PortfolioManager
 
 def test_root(client: TestClient):
     """Test the root endpoint."""
@@ -12,6 +20,37 @@ def test_health_check(client: TestClient):
     assert response.status_code == 200
     assert response.json() == {"status": "healthy"}
 
+def test_health_check_not_modified(client: TestClient):
+    """Test that a matching ETag short-circuits the health check."""
+    response = client.get("/health")
+    assert response.headers["cache-control"] == "public, max-age=1"
+    etag = response.headers["etag"]
+    response = client.get("/health", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+def test_cors_preflight(client: TestClient):
+    """Test that CORS preflight requests are answered by the middleware."""
+    response = client.options(
+        "/api/portfolio/rebalance",
+        headers={
+            "Origin": "http://localhost:3000",
+            "Access-Control-Request-Method": "POST",
+            "Access-Control-Request-Headers": "content-type"
+        }
+    )
+    assert response.status_code == 204
+    assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
+    assert response.headers["access-control-allow-headers"] == "content-type"
+    assert "POST" in response.headers["access-control-allow-methods"]
+
+def test_cors_simple_request(client: TestClient):
+    """Test that simple cross-origin requests get CORS headers."""
+    response = client.get("/", headers={"Origin": "http://localhost:3000"})
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
+    assert response.headers["access-control-allow-credentials"] == "true"
+
 def test_risk_assessment(client: TestClient, test_risk_assessment_data):
     """Test the risk assessment endpoint."""
     response = client.post("/api/risk-assessment", json=test_risk_assessment_data)
@@ -61,4 +100,114 @@ def test_rebalance_portfolio(client: TestClient):
     assert response.status_code == 200
     data = response.json()
     assert "status" in data
-    assert data["status"] == "success" 
\ No newline at end of file
+    assert data["status"] == "success" 
+
+def test_rebalance_portfolio_invalid_body(client: TestClient):
+    """Test that invalid request bodies are rejected with a validation error."""
+    response = client.post(
+        "/api/portfolio/rebalance",
+        json={"portfolio_id": "not-a-number", "current_allocation": {}}
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "portfolio_id"]
+
+def test_get_portfolio_performance(client: TestClient):
+    """Test getting portfolio performance as a JSON array."""
+    response = client.get("/api/portfolio/1/performance")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 30
+    assert {"date", "value", "benchmark"} <= data[0].keys()
+
+def test_get_portfolio_performance_ndjson(client: TestClient):
+    """Test streaming portfolio performance as newline-delimited JSON."""
+    response = client.get(
+        "/api/portfolio/1/performance",
+        headers={"Accept": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 30
+    assert {"date", "value", "benchmark"} <= rows[0].keys()
+
+def test_simulate_portfolio(client: TestClient, historical_prices):
+    """Test running a portfolio simulation on the portfolio thread pool."""
+    response = client.post(
+        "/api/portfolio/1/simulate",
+        json={"time_horizon": 1, "initial_investment": 10000, "monthly_contribution": 100}
+    )
+    assert response.status_code == 200
+    assert len(response.json()["simulation_results"]) > 0
+
+def test_backtest_portfolio(client: TestClient, historical_prices):
+    """Test backtesting an allocation on the portfolio thread pool."""
+    response = client.post(
+        "/api/portfolio/1/backtest",
+        json={"allocation": {"VTI": 0.6, "BND": 0.4}, "time_horizon": 1, "initial_investment": 10000}
+    )
+    assert response.status_code == 200
+    assert len(response.json()["backtest_results"]) > 0
+
+def test_analyze_scenario(client: TestClient, historical_prices):
+    """Test analyzing a scenario on the portfolio thread pool."""
+    response = client.post(
+        "/api/portfolio/1/analyze-scenario",
+        json={"allocation": {"VTI": 0.6, "BND": 0.4}, "time_horizon": 1, "initial_investment": 10000}
+    )
+    assert response.status_code == 200
+    assert response.json()
+
+def test_get_efficient_frontier(client: TestClient, historical_prices, monkeypatch):
+    """Test calculating the efficient frontier on the portfolio thread pool."""
+    monkeypatch.setattr(main, "_efficient_frontier_cache", {})
+    response = client.get("/api/portfolio/1/efficient-frontier")
+    assert response.status_code == 200
+    assert len(response.json()["efficient_frontier"]) > 0
+
+def test_get_efficient_frontier_empty_not_cached(client: TestClient, monkeypatch):
+    """Test that an empty efficient frontier is calculated again on the next request."""
+    calls = []
+    def calculate_efficient_frontier(self):
+        calls.append(self)
+        return []
+    monkeypatch.setattr(PortfolioManager, "calculate_efficient_frontier", calculate_efficient_frontier)
+    monkeypatch.setattr(main, "_efficient_frontier_cache", {})
+    for _ in range(2):
+        response = client.get("/api/portfolio/1/efficient-frontier")
+        assert response.status_code == 200
+        assert response.json() == {"efficient_frontier": []}
+    assert len(calls) == 2
+
+def test_get_portfolio_simulations_text_results(client: TestClient, tmp_path, monkeypatch):
+    """Test listing simulations whose results were stored as JSON text before they became bytes."""
+    path = tmp_path / "robo_advisor.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=[
+        models.SelfDefinedPortfolio.__table__,
+        models.PortfolioSimulation.__table__
+    ])
+    with engine.begin() as connection:
+        connection.execute(insert(models.SelfDefinedPortfolio), [{"id": 1, "name": "Test", "total_investment": 10000}])
+        connection.execute(insert(models.PortfolioSimulation), [{
+            "id": 1,
+            "portfolio_id": 1,
+            "name": "Legacy",
+            "time_horizon": 1,
+            "initial_investment": 10000,
+            "monthly_contribution": 100,
+            "results": b'[{"month":1,"value":10100.0}]'
+        }])
+        connection.exec_driver_sql("UPDATE portfolio_simulations SET results = CAST(results AS TEXT)")
+        migrate_simulation_results(connection)
+    engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    async def get_test_db():
+        async with AsyncSession(async_engine) as db:
+            yield db
+    monkeypatch.setitem(main.app.dependency_overrides, get_db, get_test_db)
+
+    response = client.get("/api/self-defined-portfolios/1/simulations")
+    assert response.status_code == 200
+    assert json.loads(response.json()[0]["results"]) == [{"month": 1, "value": 10100.0}]
\ No newline at end of file
@@ -1,4 +1,8 @@
+import numpy as np
+import pandas as pd
 import pytest
+import yfinance as yf
+from app.services import portfolio_manager
 from app.services.portfolio_manager import PortfolioManager
 
 def test_portfolio_manager_initialization():
@@ -8,19 +12,23 @@ def test_portfolio_manager_initialization():
     assert "US_STOCKS" in manager.asset_classes
     assert manager.asset_classes["US_STOCKS"] == "VTI"
 
-def test_optimize_portfolio():
+def test_optimize_portfolio(historical_prices):
     """Test portfolio optimization for different risk levels."""
     manager = PortfolioManager()
     
     # Test conservative portfolio
     conservative = manager.optimize_portfolio("conservative")
-    assert sum(conservative.values()) == pytest.approx(1.0)
-    assert conservative["VTI"] == pytest.approx(0.18, rel=0.01)  # 60% of 30% stocks
+    conservative_weights = {symbol: weight for symbol, weight in conservative.items() if symbol != "metrics"}
+    assert sum(conservative_weights.values()) == pytest.approx(1.0)
+    assert all(weight >= -1e-9 for weight in conservative_weights.values())  # long only
     
-    # Test aggressive portfolio
+    # Test aggressive portfolio; the risk level only seeds the optimizer, so both
+    # levels reach the same maximum Sharpe ratio portfolio
     aggressive = manager.optimize_portfolio("aggressive")
-    assert sum(aggressive.values()) == pytest.approx(1.0)
-    assert aggressive["VTI"] == pytest.approx(0.48, rel=0.01)  # 60% of 80% stocks
+    aggressive_weights = {symbol: weight for symbol, weight in aggressive.items() if symbol != "metrics"}
+    assert sum(aggressive_weights.values()) == pytest.approx(1.0)
+    assert aggressive_weights == pytest.approx(conservative_weights, abs=1e-3)
+    assert aggressive["metrics"]["sharpe_ratio"] == pytest.approx(conservative["metrics"]["sharpe_ratio"])
 
 def test_rebalance_portfolio():
     """Test portfolio rebalancing logic."""
@@ -44,4 +52,184 @@ def test_calculate_tax_loss_harvest():
     opportunities = manager.calculate_tax_loss_harvest(transactions, current_prices)
     assert len(opportunities) == 2
     assert opportunities[0]["potential_loss"] == -100  # (90-100) * 10
-    assert opportunities[1]["potential_loss"] == -100  # (45-50) * 20 
\ No newline at end of file
+    assert opportunities[1]["potential_loss"] == -100  # (45-50) * 20 
+
+def test_simulate_portfolio(monkeypatch):
+    """Test compounding of daily returns with monthly contributions."""
+    prices = pd.DataFrame(
+        {"VTI": [100, 110, 121, 121], "SPY": [100, 100, 100, 50]},
+        index=pd.to_datetime(["2024-01-30", "2024-01-31", "2024-02-01", "2024-02-02"])
+    )
+    monkeypatch.setattr(PortfolioManager, "get_historical_data",
+                        lambda self, symbols, period="5y": prices[symbols])
+    monkeypatch.setattr(portfolio_manager, "_metrics_cache", {})
+    manager = PortfolioManager()
+    
+    values = manager.simulate_portfolio({"VTI": 1.0}, 1000, 100, 1)
+    assert values == [
+        {"date": "2024-01-31", "portfolioValue": 1100.0, "benchmarkValue": 1000.0},
+        {"date": "2024-02-01", "portfolioValue": 1320.0, "benchmarkValue": 1100.0},  # (1100 + 100) * 1.1
+        {"date": "2024-02-02", "portfolioValue": 1320.0, "benchmarkValue": 550.0}
+    ]
+    
+    # Comparing portfolios simulates each one against the same benchmark
+    both = manager.simulate_portfolios([{"VTI": 1.0}, {"VTI": 0.5}], 1000, 100, 1)
+    assert both[0] == values
+    assert both[1][-1]["portfolioValue"] == pytest.approx(1207.5)  # (1050 + 100) * 1.05
+
+def test_get_portfolio_stats_max_drawdown(monkeypatch):
+    """Test that max drawdown is reported as a single positive fraction."""
+    prices = pd.DataFrame(
+        {"VTI": [100, 120, 90, 100]},
+        index=pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"])
+    )
+    monkeypatch.setattr(PortfolioManager, "get_historical_data",
+                        lambda self, symbols, period="5y": prices[symbols])
+    monkeypatch.setattr(PortfolioManager, "get_dividend_yields",
+                        lambda self, symbols: dict.fromkeys(symbols, 0.0))
+    monkeypatch.setattr(portfolio_manager, "_metrics_cache", {})
+    manager = PortfolioManager()
+    
+    stats = manager.get_portfolio_stats({"VTI": 1.0}, 100000)
+    assert stats["max_drawdown"] == pytest.approx(0.25)  # 120 -> 90
+
+def test_get_dividend_yields(monkeypatch):
+    """Test that dividend yields are computed from one download and cached."""
+    index = pd.to_datetime(["2024-01-01", "2024-01-02"])
+    data = pd.concat({
+        "Close": pd.DataFrame({"VTI": [100.0, 200.0], "BND": [50.0, 50.0]}, index=index),
+        "Dividends": pd.DataFrame({"VTI": [1.0, 1.0], "BND": [0.0, 0.0]}, index=index)
+    }, axis=1)
+    downloads = []
+    def download(symbols, **kwargs):
+        downloads.append(symbols)
+        return data
+    monkeypatch.setattr(yf, "download", download)
+    monkeypatch.setattr(portfolio_manager, "_dividend_yield_cache", {})
+    manager = PortfolioManager()
+    
+    assert manager.get_dividend_yields(["VTI", "BND"]) == {"VTI": 0.01, "BND": 0.0}
+    assert manager.get_dividend_yields(["BND", "VTI"]) == {"BND": 0.0, "VTI": 0.01}
+    assert downloads == [["VTI", "BND"]]
+
+def test_get_dividend_yields_single_ticker(monkeypatch):
+    """Test dividend yields from a single-ticker download without a symbol column level."""
+    index = pd.to_datetime(["2024-01-01", "2024-01-02"])
+    data = pd.DataFrame({"Close": [100.0, 200.0], "Dividends": [1.0, 1.0]}, index=index)
+    monkeypatch.setattr(yf, "download", lambda symbols, **kwargs: data)
+    monkeypatch.setattr(portfolio_manager, "_dividend_yield_cache", {})
+    monkeypatch.setattr(portfolio_manager, "_dividend_yield_failure_cache", {})
+    manager = PortfolioManager()
+    
+    assert manager.get_dividend_yields(["VTI"]) == {"VTI": 0.01}
+
+def test_calculate_estimated_income(monkeypatch):
+    """Test that estimated income is reported in ten thousand dollars from fractional yields."""
+    index = pd.to_datetime(["2024-01-01", "2024-01-02"])
+    data = pd.concat({
+        "Close": pd.DataFrame({"VTI": [100.0, 100.0], "BND": [50.0, 50.0]}, index=index),
+        "Dividends": pd.DataFrame({"VTI": [0.0, 2.0], "BND": [1.0, 1.0]}, index=index)
+    }, axis=1)
+    monkeypatch.setattr(yf, "download", lambda symbols, **kwargs: data)
+    monkeypatch.setattr(portfolio_manager, "_dividend_yield_cache", {})
+    manager = PortfolioManager()
+    
+    # 60% at a 2% yield and 40% at a 4% yield on $100,000 is $2,800 a year
+    income = manager._calculate_estimated_income({"VTI": 0.6, "BND": 0.4}, 100000)
+    assert income == pytest.approx(0.28)
+
+def test_get_dividend_yields_failure(monkeypatch):
+    """Test that failed dividend yield fetches count as 0 and are not retried immediately."""
+    downloads = []
+    def download(symbols, **kwargs):
+        downloads.append(symbols)
+        raise OSError("rate limited")
+    monkeypatch.setattr(yf, "download", download)
+    monkeypatch.setattr(portfolio_manager, "_dividend_yield_cache", {})
+    monkeypatch.setattr(portfolio_manager, "_dividend_yield_failure_cache", {})
+    manager = PortfolioManager()
+    
+    assert manager.get_dividend_yields(["VTI"]) == {"VTI": 0.0}
+    assert manager.get_dividend_yields(["VTI"]) == {"VTI": 0.0}
+    assert downloads == [["VTI"]]
+
+def test_get_current_prices_empty_download(monkeypatch):
+    """Test that symbols missing from an empty price download are left out instead of failing."""
+    columns = pd.MultiIndex.from_product([["Close"], ["BND", "VXUS"]])
+    monkeypatch.setattr(yf, "download", lambda symbols, **kwargs: pd.DataFrame(columns=columns))
+    monkeypatch.setattr(portfolio_manager, "_price_cache", {"VTI": 250.0})
+    manager = PortfolioManager()
+    
+    assert manager.get_current_prices(["VTI", "BND", "VXUS"]) == {"VTI": 250.0}
+
+def test_calculate_portfolio_metrics_regularizes_covariance():
+    """Test that a singular covariance comes back symmetric and positive definite."""
+    prices = pd.DataFrame(
+        {"VTI": [100.0, 110.0, 99.0, 108.9], "SPY": [200.0, 220.0, 198.0, 217.8], "BND": [50.0, 50.0, 50.0, 50.0]},
+        index=pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"])
+    )
+    manager = PortfolioManager()
+    
+    _, cov_matrix, _ = manager.calculate_portfolio_metrics(prices)
+    assert np.array_equal(cov_matrix, cov_matrix.T)
+    assert np.linalg.eigvalsh(cov_matrix)[0] >= portfolio_manager.MIN_COVARIANCE_EIGENVALUE * 0.99
+    np.linalg.cholesky(cov_matrix)
+
+def test_get_annualized_stats(monkeypatch):
+    """Test that annualized stats are cached per symbol set and follow the requested order."""
+    prices = pd.DataFrame(
+        {"BND": [100.0, 101.0, 100.0, 102.0], "VTI": [100.0, 110.0, 99.0, 108.9]},
+        index=pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"])
+    )
+    downloads = []
+    def get_historical_data(self, symbols, period="5y"):
+        downloads.append(symbols)
+        return prices[symbols]
+    monkeypatch.setattr(PortfolioManager, "get_historical_data", get_historical_data)
+    monkeypatch.setattr(portfolio_manager, "_metrics_cache", {})
+    manager = PortfolioManager()
+    
+    mean_returns, cov_matrix, returns = manager.get_annualized_stats(["VTI", "BND"])
+    expected = manager.calculate_portfolio_metrics(prices[["VTI", "BND"]])
+    assert mean_returns == pytest.approx(expected[0])
+    assert cov_matrix == pytest.approx(expected[1])
+    assert returns == pytest.approx(expected[2])
+    
+    manager.get_annualized_stats(["BND", "VTI"])
+    assert downloads == [["BND", "VTI"]]
+
+def test_get_historical_data_empty_download(monkeypatch, tmp_path):
+    """Test that an empty download is not cached, so the next call downloads again."""
+    downloads = []
+    def download(symbols, **kwargs):
+        downloads.append(symbols)
+        return pd.DataFrame(columns=pd.MultiIndex.from_product([["Close"], symbols]))
+    monkeypatch.setattr(yf, "download", download)
+    monkeypatch.setattr(portfolio_manager, "HISTORY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(portfolio_manager, "_history_cache", {})
+    manager = PortfolioManager()
+    
+    assert manager.get_historical_data(["VTI", "BND"], period="1y").empty
+    assert manager.get_historical_data(["VTI", "BND"], period="1y").empty
+    assert len(downloads) == 2
+
+def test_get_historical_data_disk_cache(monkeypatch, tmp_path):
+    """Test that downloaded history is reused from disk once the in-memory cache is gone."""
+    closes = pd.DataFrame(
+        {"BND": [70.0, 70.5], "VTI": [250.0, 252.5]},
+        index=pd.DatetimeIndex(pd.to_datetime(["2024-01-02", "2024-01-03"]), name="Date")
+    )
+    downloads = []
+    def download(symbols, **kwargs):
+        downloads.append(symbols)
+        return pd.concat({"Close": closes}, axis=1)
+    monkeypatch.setattr(yf, "download", download)
+    monkeypatch.setattr(portfolio_manager, "HISTORY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(portfolio_manager, "_history_cache", {})
+    manager = PortfolioManager()
+    
+    first = manager.get_historical_data(["VTI", "BND"], period="1y")
+    monkeypatch.setattr(portfolio_manager, "_history_cache", {})
+    second = manager.get_historical_data(["VTI", "BND"], period="1y")
+    pd.testing.assert_frame_equal(second, first)
+    assert downloads == [["BND", "VTI"]]
\ No newline at end of file
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import pytest
+from sqlalchemy import create_engine, insert, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.api.routers import portfolio
+from app.api.routers.portfolio import load_portfolio_allocation
+from app.models.models import Portfolio, PortfolioAllocation, migrate_portfolio_allocations
+from app.models.portfolio import PortfolioSimulation, add_portfolio_indexes
+
+@pytest.fixture
+def database_path(tmp_path):
+    """SQLite database predating portfolio_allocations, holding portfolios with JSON allocations only."""
+    path = tmp_path / "robo_advisor.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Portfolio.__table__.create(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Portfolio), [
+            {"id": 1, "total_value": 100000.0, "allocation": {"VTI": 0.6, "BND": 0.4}},
+            {"id": 2, "total_value": 50000.0, "allocation": None}
+        ])
+    engine.dispose()
+    return path
+
+def run_with_db(path, query):
+    """Await query(db) with a session on the database at path."""
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with AsyncSession(engine) as db:
+            result = await query(db)
+        await engine.dispose()
+        return result
+    return asyncio.run(run())
+
+def load_allocation(path, portfolio_id):
+    return run_with_db(path, lambda db: load_portfolio_allocation(db, portfolio_id))
+
+def test_migrate_portfolio_allocations(database_path):
+    """Test copying JSON allocations into a missing portfolio_allocations table, once."""
+    engine = create_engine(f"sqlite:///{database_path}")
+    with engine.begin() as connection:
+        assert len(migrate_portfolio_allocations(connection)) == 2
+    with engine.begin() as connection:
+        assert migrate_portfolio_allocations(connection) == []
+        rows = connection.execute(
+            select(PortfolioAllocation.portfolio_id, PortfolioAllocation.symbol, PortfolioAllocation.weight)
+        ).all()
+    engine.dispose()
+    assert sorted(rows) == [(1, "BND", 0.4), (1, "VTI", 0.6)]
+
+def test_add_portfolio_indexes(database_path):
+    """Test adding the portfolio_id indexes to tables created before them, skipping missing tables."""
+    engine = create_engine(f"sqlite:///{database_path}")
+    PortfolioSimulation.__table__.create(engine)
+    for index in PortfolioSimulation.__table__.indexes:
+        index.drop(engine)
+    with engine.begin() as connection:
+        add_portfolio_indexes(connection)
+        add_portfolio_indexes(connection)
+    indexes = {index["name"] for index in inspect(engine).get_indexes("portfolio_simulations")}
+    engine.dispose()
+    assert indexes == {index.name for index in PortfolioSimulation.__table__.indexes}
+
+def test_load_portfolio_allocation_from_rows(database_path):
+    """Test that allocation rows take precedence over the JSON column."""
+    engine = create_engine(f"sqlite:///{database_path}")
+    PortfolioAllocation.__table__.create(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(PortfolioAllocation), [
+            {"portfolio_id": 1, "symbol": "VTI", "weight": 1.0}
+        ])
+    engine.dispose()
+    assert load_allocation(database_path, 1) == (100000.0, {"VTI": 1.0})
+
+def test_load_portfolio_allocation_from_json(database_path):
+    """Test falling back to the JSON column for portfolios without allocation rows."""
+    engine = create_engine(f"sqlite:///{database_path}")
+    PortfolioAllocation.__table__.create(engine)
+    engine.dispose()
+    assert load_allocation(database_path, 1) == (100000.0, {"VTI": 0.6, "BND": 0.4})
+    assert load_allocation(database_path, 2) == (50000.0, {})
+
+def test_get_portfolio_stats_off_event_loop(database_path, monkeypatch):
+    """Test that portfolio statistics are calculated on the portfolio thread pool, not the event loop."""
+    threads = []
+    def get_portfolio_stats(allocation, total_value):
+        threads.append(threading.current_thread())
+        return {"total_value": total_value, "allocation": allocation}
+    monkeypatch.setattr(portfolio.portfolio_manager, "get_portfolio_stats", get_portfolio_stats)
+    engine = create_engine(f"sqlite:///{database_path}")
+    PortfolioAllocation.__table__.create(engine)
+    engine.dispose()
+
+    stats = run_with_db(database_path, lambda db: portfolio.get_portfolio_stats(1, db))
+    assert stats == {"total_value": 100000.0, "allocation": {"VTI": 0.6, "BND": 0.4}}
+    assert threads and threads[0] is not threading.main_thread()
\ No newline at end of file